@@ -0,0 +1,59 @@
+import functools
+import os
+
+# ==========================================
+# IMAGES REDIMENSIONNÉES (web & PDF)
+# ==========================================
+# logo.png (1024 px, 2,2 Mo) et frise.png (1536 px, 3,2 Mo) sont bien plus grands que leur taille d'affichage.
+# Chaque variante est produite une seule fois dans assets_cache/ (refaite si la source est plus récente),
+# puis ses octets sont gardés en mémoire pour tout le processus : les sessions et reruns ne relisent
+# ni ne décodent plus les PNG d'origine.
+
+DOSSIER = os.path.dirname(os.path.abspath(__file__))
+DOSSIER_CACHE = os.path.join(DOSSIER, "assets_cache")
+
+# nom -> (fichier source, largeur max en px, format)
+VARIANTS = {
+    "logo_web": ("logo.png", 320, "WEBP"),
+    "logo_pdf": ("logo.png", 300, "JPEG"),   # 25 mm à ~300 dpi ; JPEG est intégré tel quel par FPDF
+    "frise_web": ("frise.png", 1200, "WEBP"),
+}
+EXTENSIONS = {"WEBP": ".webp", "JPEG": ".jpg", "PNG": ".png"}
+
+def _build_variant(source, largeur, fmt, cible):
+    from PIL import Image  # dépendance de Streamlit, facultative pour le PDF seul
+    with Image.open(source) as im:
+        if im.width > largeur:
+            im = im.resize((largeur, round(im.height * largeur / im.width)), Image.LANCZOS)
+        if fmt == "JPEG": im = im.convert("RGB")
+        tmp = f"{cible}.{os.getpid()}.tmp"
+        if fmt == "WEBP": im.save(tmp, fmt, quality=85, method=6)
+        elif fmt == "JPEG": im.save(tmp, fmt, quality=90, optimize=True)
+        else: im.save(tmp, fmt, optimize=True)
+    os.replace(tmp, cible)  # atomique : plusieurs processus peuvent construire en même temps
+
+@functools.lru_cache(maxsize=None)
+def variant_path(nom):
+    # Chemin de la variante, ou de l'image d'origine si Pillow est absent ou la conversion échoue
+    fichier, largeur, fmt = VARIANTS[nom]
+    source = os.path.join(DOSSIER, fichier)
+    cible = os.path.join(DOSSIER_CACHE, nom + EXTENSIONS[fmt])
+    try:
+        if not os.path.exists(cible) or os.path.getmtime(cible) < os.path.getmtime(source):
+            os.makedirs(DOSSIER_CACHE, exist_ok=True)
+            _build_variant(source, largeur, fmt, cible)
+        return cible
+    except (ImportError, OSError):
+        return source
+
+@functools.lru_cache(maxsize=None)
+def variant_bytes(nom):
+    with open(variant_path(nom), "rb") as f:
+        return f.read()
+
+def build_all():
+    return {nom: variant_path(nom) for nom in VARIANTS}
+
+if __name__ == "__main__":
+    for nom, chemin in build_all().items():
+        print(f"{nom}: {chemin} ({os.path.getsize(chemin) / 1e3:.0f} Ko)")
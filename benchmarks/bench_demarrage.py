@@ -0,0 +1,62 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ==========================================
+# BENCHMARK : démarrage à froid et taille des reruns
+# ==========================================
+# Chaque mesure tourne dans un interpréteur neuf (rien en cache, modules non importés) :
+#   premier_run_ms    : première exécution du script (imports du projet + premier rendu), via AppTest
+#   modules_charges   : modules Python importés par ce premier run
+#   octets_<rerun>    : taille des messages envoyés au navigateur (ForwardMsg sérialisés) par rerun
+# python benchmarks/bench_demarrage.py [--repetitions 5] [--json resultats.json]
+
+def measure():
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+    octets = []
+    forward_msgs = LocalScriptRunner.forward_msgs
+    def compte(self):
+        msgs = forward_msgs(self); octets.append(sum(msg.ByteSize() for msg in msgs)); return msgs
+    LocalScriptRunner.forward_msgs = compte
+
+    os.chdir(RACINE)
+    avant = set(sys.modules)
+    at = AppTest.from_file(os.path.join(RACINE, "app_biere.py"), default_timeout=60)
+    t = time.perf_counter(); at.run(); premier = time.perf_counter() - t
+    modules = len(set(sys.modules) - avant)
+    at.toggle(key="t_🍊").set_value(True).run()
+    at.button[0].click().run()
+    at.slider(key="degre_vise").set_value(7.0).run()
+    if at.exception: raise RuntimeError(f"Exception dans l'app : {at.exception}")
+    return {
+        "premier_run_ms": premier * 1e3, "modules_charges": modules, "fpdf_importe": "fpdf" in sys.modules,
+        **{f"octets_{nom}": n for nom, n in zip(["chargement", "arome", "generation", "curseur"], octets)}
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--json")
+    parser.add_argument("--enfant", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.enfant:
+        print(json.dumps(measure())); return
+
+    mesures = []
+    for _ in range(args.repetitions):
+        sortie = subprocess.run([sys.executable, __file__, "--enfant"], capture_output=True, text=True, check=True).stdout
+        mesures.append(json.loads(sortie.strip().splitlines()[-1]))
+    # Médiane des temps ; les tailles et le nombre de modules ne varient pas d'un run à l'autre
+    resultat = dict(mesures[0]); resultat["premier_run_ms"] = sorted(m["premier_run_ms"] for m in mesures)[len(mesures) // 2]
+    for nom, valeur in resultat.items(): print(f"{nom:<22} {valeur:>12.4g}" if not isinstance(valeur, bool) else f"{nom:<22} {valeur!s:>12}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(resultat, f, indent=2)
+
+if __name__ == "__main__":
+    main()
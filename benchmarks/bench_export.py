@@ -0,0 +1,59 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+# ==========================================
+# BENCHMARK : export en masse (débit et mémoire crête)
+# ==========================================
+# Chaque mesure tourne dans un interpréteur neuf : la mémoire crête (ru_maxrss) ne doit dépendre que de
+# la taille de bloc, pas du nombre de lignes exportées. Grille complète de l'app (1,7 M recettes),
+# ou sous-ensemble de styles avec --styles.
+# python benchmarks/bench_export.py [--formats csv jsonl parquet] [--blocs 8192 65536] [--json resultats.json]
+
+def measure(format_, taille_bloc, styles, shards):
+    import export_recettes as ex
+    grille = ex.make_grid(styles)
+    with tempfile.TemporaryDirectory() as dossier:
+        t = time.perf_counter()
+        fichiers = ex.export_grid(grille, os.path.join(dossier, f"recettes.{format_}"), taille_bloc=taille_bloc, shards=shards)
+        duree = time.perf_counter() - t
+        taille = sum(os.path.getsize(chemin) for chemin, _ in fichiers)
+    lignes = sum(n for _, n in fichiers)
+    return {
+        "format": format_, "taille_bloc": taille_bloc, "shards": shards, "lignes": lignes, "duree_s": duree,
+        "lignes_par_s": lignes / duree, "octets": taille, "rss_max_mo": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--formats", nargs="+", default=["csv", "jsonl", "parquet"])
+    parser.add_argument("--blocs", type=int, nargs="+", default=[8_192, 65_536])
+    parser.add_argument("--styles", nargs="+")
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--json")
+    parser.add_argument("--enfant", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.enfant:
+        print(json.dumps(measure(args.enfant[0], int(args.enfant[1]), args.styles, args.shards))); return
+
+    resultats = []
+    print(f"{'format':>8} {'bloc':>7} {'lignes':>9} {'durée s':>8} {'lignes/s':>10} {'Mo écrits':>10} {'RSS max Mo':>11}")
+    for format_ in args.formats:
+        for bloc in args.blocs:
+            commande = [sys.executable, __file__, "--enfant", format_, str(bloc), "--shards", str(args.shards)] + (["--styles", *args.styles] if args.styles else [])
+            r = json.loads(subprocess.run(commande, capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1])
+            resultats.append(r)
+            print(f"{format_:>8} {bloc:>7} {r['lignes']:>9} {r['duree_s']:>8.2f} {r['lignes_par_s']:>10,.0f} {r['octets'] / 1e6:>10.1f} {r['rss_max_mo']:>11.0f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(resultats, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import moteur_biere as m
+from planification import plan_production, recipe_needs
+
+# ==========================================
+# BENCHMARK : planification de production (milliers de brassins)
+# ==========================================
+# Demandes tirées au hasard sur tout l'espace des curseurs ; le stock couvre --couverture de la
+# demande totale de chaque ingrédient, avec des ruptures marquées (Citra, Pilsner) pour exercer
+# les substitutions. Trois variantes : ordre d'arrivée, glouton trié, glouton trié + substitutions.
+# python benchmarks/bench_planification.py [--tailles 1000 5000 10000] [--json resultats.json]
+
+RUPTURES = {"Citra": 0.1, "Pilsner": 0.4, "Magnum": 0.5}
+
+def random_requests(n, rng):
+    styles = list(m.STYLES_DEF); emojis = [e for e, _ in m.AROMA_DATA]; amertumes = list(m.IBU_MAP)
+    return [
+        (rng.choice(styles), rng.randrange(10, 101, 10), round(rng.uniform(3, 12), 1), rng.choice(amertumes), rng.sample(emojis, rng.randrange(3)))
+        for _ in range(n)
+    ]
+
+def inventory_for(demandes, couverture):
+    total = {}
+    for r in m.generate_recipes(demandes):
+        for nom, q in recipe_needs(r).items(): total[nom] = total.get(nom, 0) + q
+    return {nom: q * RUPTURES.get(nom, couverture) for nom, q in total.items()}
+
+def check_stock(inventaire, plan):
+    # Conservation : stock restant = stock initial - besoins des lots planifiés (substitutions comprises)
+    attendu = dict(inventaire)
+    for lot in plan["lots"]:
+        for nom, q in recipe_needs(lot["recette"]).items(): attendu[nom] = attendu.get(nom, 0) - q
+    for nom in set(attendu) | set(plan["stock_restant"]):
+        ecart = plan["stock_restant"].get(nom, 0) - max(attendu.get(nom, 0), 0)
+        if abs(ecart) > 1e-6: raise RuntimeError(f"stock restant incohérent pour {nom} : écart {ecart:+.6g}")
+
+VARIANTES = {
+    "arrivee": {"tri": False, "substitutions": False},
+    "glouton": {"tri": True, "substitutions": False},
+    "glouton+subst": {"tri": True, "substitutions": True},
+}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tailles", type=int, nargs="+", default=[1_000, 5_000, 10_000])
+    parser.add_argument("--couverture", type=float, default=0.6, help="part de la demande totale couverte par le stock")
+    parser.add_argument("--json")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    resultats = []
+    print(f"{'demandes':>9} {'variante':>14} {'planifiés':>10} {'%':>6} {'substit.':>9} {'durée s':>8}")
+    for n in args.tailles:
+        demandes = random_requests(n, rng)
+        inventaire = inventory_for(demandes, args.couverture)
+        for nom, options in VARIANTES.items():
+            t = time.perf_counter(); plan = plan_production(inventaire, demandes, **options); duree = time.perf_counter() - t
+            check_stock(inventaire, plan)
+            s = plan["stats"]
+            resultats.append({"demandes": n, "variante": nom, "duree_s": duree, **s})
+            print(f"{n:>9} {nom:>14} {s['planifiees']:>10} {s['planifiees'] / n:>6.1%} {s['avec_substitution']:>9} {duree:>8.3f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(resultats, f, indent=2)
+
+if __name__ == "__main__":
+    main()
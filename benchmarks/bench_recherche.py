@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import moteur_biere as m
+import recherche_vectorielle as rv
+from catalogue_bieres import load_catalog
+
+# ==========================================
+# BENCHMARK : latence de la recherche de voisins selon la taille du catalogue
+# ==========================================
+# Le catalogue réel (44 bières) est ré-échantillonné avec du bruit sur ABV et EBC
+# pour simuler des catalogues de 1k à 1M lignes.
+# python benchmarks/bench_recherche.py [--tailles 44 1000 ...] [--json resultats.json]
+
+def synthetic_catalog(X_base, n, rng):
+    if n <= len(X_base): return X_base[:n].copy()
+    X = X_base[rng.integers(0, len(X_base), n)].copy()
+    X[:, rv.COL_ABV] += rng.normal(0, 0.5 * rv.POIDS_ABV, n).astype(np.float32)
+    X[:, rv.COL_EBC] += rng.normal(0, 0.2 * rv.POIDS_EBC, n).astype(np.float32)
+    return X
+
+def random_queries(n, rng):
+    styles = list(m.STYLES_DEF); emojis = [e for e, _ in m.AROMA_DATA]; amertumes = list(m.IBU_MAP)
+    lot = []
+    for _ in range(n):
+        aromes = list(rng.choice(emojis, rng.integers(0, 3), replace=False))
+        lot.append((styles[rng.integers(len(styles))], 20, round(float(rng.uniform(3, 12)), 1), amertumes[rng.integers(4)], aromes))
+    return np.stack([rv.encode_recipe(r) for r in m.generate_recipes(lot)])
+
+def timed_queries(index, Q, k):
+    # Latence unitaire (une requête à la fois, comme un rerun) et débit par lot
+    lat = []
+    for q in Q:
+        t = time.perf_counter(); index.search(q, k); lat.append(time.perf_counter() - t)
+    t = time.perf_counter(); index.search(Q, k); lot = time.perf_counter() - t
+    lat = np.array(lat) * 1e3
+    return {"p50_ms": float(np.percentile(lat, 50)), "p99_ms": float(np.percentile(lat, 99)), "lot_qps": len(Q) / lot}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tailles", type=int, nargs="+", default=[44, 1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--requetes", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--json")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X_base = rv.encode_catalog(load_catalog())
+    Q = random_queries(args.requetes, rng)
+    resultats = []
+    print(f"{'lignes':>9} {'index':>11} {'constr. s':>10} {'p50 ms':>8} {'p99 ms':>8} {'lot req/s':>10} {'rappel':>7}")
+    for n in args.tailles:
+        X = synthetic_catalog(X_base, n, rng)
+        t = time.perf_counter(); brute = rv.BruteForceIndex(X); t_brute = time.perf_counter() - t
+        _, I_exact = brute.search(Q, args.k)
+        lignes = [("brute", brute, t_brute)]
+        if n >= 1_000:
+            t = time.perf_counter(); ivf = rv.PartitionedIndex(X); lignes.append(("partitions", ivf, time.perf_counter() - t))
+        for nom, index, t_constr in lignes:
+            r = timed_queries(index, Q, args.k)
+            _, I = index.search(Q, args.k)
+            # Rappel@k par rapport à la recherche exacte
+            r["rappel"] = float(np.mean([len(set(a) & set(b)) / args.k for a, b in zip(I, I_exact)]))
+            r.update(lignes_catalogue=n, index=nom, construction_s=t_constr)
+            resultats.append(r)
+            print(f"{n:>9} {nom:>11} {t_constr:>10.3f} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['lot_qps']:>10.0f} {r['rappel']:>7.2f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(resultats, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+import moteur_biere as m
+
+# ==========================================
+# TEST DE CHARGE DU SERVICE HTTP (service_biere.py)
+# ==========================================
+# Lance une instance locale (ou cible --url), ouvre N connexions keep-alive et envoie des
+# requêtes en boucle pendant --duree secondes ; rapporte req/s, p50, p99 et les 503.
+# python benchmarks/charge_service.py --scenarios recette pdf --concurrence 32 --duree 10
+# Scénario "pdf" : réglages tirés au hasard (le cache PDF ne masque pas le coût du rendu) ;
+# "pdf-chaud" : quelques recettes seulement (mesure le chemin cache / déduplication).
+
+def random_body(rng, varie=True):
+    if not varie: rng = random.Random(rng.randrange(8))
+    aromes = rng.sample([e for e, _ in m.AROMA_DATA], rng.randrange(3))
+    return {
+        "style": rng.choice(list(m.STYLES_DEF)), "volume": rng.randrange(10, 101, 10),
+        "abv": round(rng.uniform(3, 12), 1), "amertume": rng.choice(list(m.IBU_MAP)), "aromes": aromes
+    }
+
+SCENARIOS = {
+    "recette": ("/recette", True), "pdf": ("/recette/pdf", True), "pdf-chaud": ("/recette/pdf", False)
+}
+
+# --- CLIENT HTTP/1.1 MINIMAL (keep-alive, Content-Length) ---
+async def post(lecteur, ecrivain, hote, chemin, corps):
+    donnees = json.dumps(corps).encode("utf-8")
+    ecrivain.write(
+        f"POST {chemin} HTTP/1.1\r\nHost: {hote}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(donnees)}\r\n\r\n".encode("ascii") + donnees
+    )
+    await ecrivain.drain()
+    statut = int((await lecteur.readline()).split()[1])
+    longueur = 0
+    while True:
+        ligne = await lecteur.readline()
+        if ligne in (b"\r\n", b""): break
+        nom, _, valeur = ligne.decode("latin-1").partition(":")
+        if nom.lower() == "content-length": longueur = int(valeur)
+    await lecteur.readexactly(longueur)
+    return statut
+
+async def client(hote, port, chemin, varie, fin, graine, latences, statuts):
+    rng = random.Random(graine)
+    lecteur, ecrivain = await asyncio.open_connection(hote, port)
+    try:
+        while time.perf_counter() < fin:
+            t = time.perf_counter()
+            statut = await post(lecteur, ecrivain, hote, chemin, random_body(rng, varie))
+            if statut == 200: latences.append(time.perf_counter() - t)
+            statuts[statut] = statuts.get(statut, 0) + 1
+    finally:
+        ecrivain.close()
+
+async def run_scenario(hote, port, nom, concurrence, duree):
+    chemin, varie = SCENARIOS[nom]
+    latences = []; statuts = {}
+    debut = time.perf_counter(); fin = debut + duree
+    await asyncio.gather(*(client(hote, port, chemin, varie, fin, i, latences, statuts) for i in range(concurrence)))
+    ecoule = time.perf_counter() - debut
+    latences.sort()
+    centile = lambda q: latences[min(len(latences) - 1, int(q * (len(latences) - 1)))] * 1e3 if latences else 0.0
+    return {
+        "scenario": nom, "concurrence": concurrence, "requetes": sum(statuts.values()), "req_s": len(latences) / ecoule,
+        "p50_ms": centile(0.5), "p99_ms": centile(0.99), "rejets_503": statuts.get(503, 0),
+        "erreurs": sum(n for s, n in statuts.items() if s not in (200, 503))
+    }
+
+# --- INSTANCE LOCALE ---
+def start_local(port, workers):
+    commande = [sys.executable, os.path.join(RACINE, "service_biere.py"), "--port", str(port)]
+    if workers: commande += ["--workers", str(workers)]
+    processus = subprocess.Popen(commande, cwd=RACINE)
+    for _ in range(200):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/sante", timeout=1); return processus
+        except OSError:
+            if processus.poll() is not None: break
+            time.sleep(0.1)
+    processus.kill()
+    raise RuntimeError("le service n'a pas démarré")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="instance existante (ex. http://127.0.0.1:8000) ; sinon une instance locale est lancée")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, help="processus PDF de l'instance locale")
+    parser.add_argument("--scenarios", nargs="+", default=["recette", "pdf", "pdf-chaud"], choices=list(SCENARIOS))
+    parser.add_argument("--concurrence", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--duree", type=float, default=5.0)
+    parser.add_argument("--json")
+    args = parser.parse_args()
+
+    processus = None
+    if args.url:
+        hote, _, port = args.url.split("//")[-1].rstrip("/").partition(":"); port = int(port or 80)
+    else:
+        hote, port = "127.0.0.1", args.port
+        processus = start_local(port, args.workers)
+    resultats = []
+    try:
+        print(f"{'scénario':>10} {'conc.':>6} {'requêtes':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'503':>6} {'err.':>5}")
+        for nom in args.scenarios:
+            for c in args.concurrence:
+                r = asyncio.run(run_scenario(hote, port, nom, c, args.duree))
+                resultats.append(r)
+                print(f"{nom:>10} {c:>6} {r['requetes']:>9} {r['req_s']:>9.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['rejets_503']:>6} {r['erreurs']:>5}")
+        stats = json.load(urllib.request.urlopen(f"http://{hote}:{port}/stats"))
+        print(f"lots PDF : {stats['pdf']['lots']}, taille moyenne {stats['pdf']['taille_moyenne_lot']:.1f}, cache PDF {stats['pdf']['cache']['hit_rate']:.0%}")
+    finally:
+        if processus: processus.terminate(); processus.wait()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(resultats, f, indent=2)
+
+if __name__ == "__main__":
+    main()
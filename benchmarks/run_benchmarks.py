@@ -0,0 +1,132 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+import moteur_biere as m
+import solveur_recette
+import houblonnage
+
+# ==========================================
+# SUITE DE BENCHMARKS
+# ==========================================
+# 1. micro   : noyaux de calcul (grains, houblons, couleur, résolution style/arômes, recette complète, solveur inverse,
+#              planning de houblonnage sur une plage de gravités)
+# 2. pdf     : débit de create_pdf_compact (PDF/s, octets, pic mémoire) et du livret
+# 3. app     : latence d'un rerun complet via streamlit.testing (chargement, arôme, curseur, génération)
+#
+# python benchmarks/run_benchmarks.py --output resultats.json
+# python benchmarks/run_benchmarks.py --compare reference.json --tolerance 0.25   (code 1 si régression)
+
+RECETTE_TYPE = ("IPA", 20, 6.5, "Forte", ["🍊", "🌲"])
+# Planning de 10 ajouts (premier moût, ébullition, whirlpool, dry hop) évalué sur 10 000 gravités
+PLANNING_TYPE = (
+    [{"nom": "Magnum", "poids": 10, "type": "premier_mout"}, {"nom": "Magnum", "poids": 10, "type": "ebullition", "temps": 60}]
+    + [{"nom": "Citra", "poids": 15, "type": "ebullition", "temps": t} for t in (30, 20, 15, 10, 5, 0)]
+    + [{"nom": "Citra", "poids": 50, "type": "whirlpool", "temps": 20, "temperature": 80}, {"nom": "Galaxy", "poids": 60, "type": "dry_hop"}]
+)
+
+def _par_appel(stmt, nombre, repetitions=5):
+    # Meilleur temps moyen par appel (µs) sur plusieurs répétitions : le moins bruité
+    return min(timeit.repeat(stmt, number=nombre, repeat=repetitions)) / nombre * 1e6
+
+# --- 1. MICRO ---
+def bench_micro():
+    og = m.calc_og_from_abv(6.5)
+    malts = [(4.5, m.MALTS_DB["Pale Ale"]), (0.35, m.MALTS_DB["Carapils"])]
+    gravites = [0.85 + 0.25 * i / 9999 for i in range(10_000)]
+    return {
+        "calc_grain_weight_us": _par_appel(lambda: m.calc_grain_weight(og, 20, 0.75, 78.5), 200_000),
+        "calc_hops_weight_us": _par_appel(lambda: m.calc_hops_weight(40, 12.0, 60, 20, og * 0.85), 200_000),
+        "estimate_color_us": _par_appel(lambda: m.estimate_color(malts, 20), 200_000),
+        "resolve_ingredients_us": _par_appel(lambda: m.resolve_ingredients("IPA", ["🍊", "🌲"]), 200_000),
+        "generate_recipe_us": _par_appel(lambda: m.generate_recipe(*RECETTE_TYPE), 20_000),
+        # Solveur inverse N grains / M houblons : budget d'un rerun interactif (< 100 ms)
+        "schedule_ibu_10x10k_us": _par_appel(lambda: houblonnage.total_ibu(PLANNING_TYPE, 20, gravites), 20),
+        "solve_recipe_us": _par_appel(lambda: solveur_recette.solve_recipe(20, 30, 40, abv=6.5, n_malts=(2, 3, 4)), 5, 3),
+    }
+
+# --- 2. PDF ---
+def bench_pdf(n=200):
+    from pdf_biere import create_pdf_compact, create_pdf_booklet
+    recette = m.generate_recipe(*RECETTE_TYPE)
+    create_pdf_compact(recette)  # préchauffage : logo décodé, polices chargées
+    t = time.perf_counter()
+    for _ in range(n): pdf = create_pdf_compact(recette)
+    duree = time.perf_counter() - t
+    tracemalloc.start(); create_pdf_compact(recette); pic = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+    lot = m.generate_recipes([(s, v, 6.0, "Moyenne", []) for s in m.STYLES_DEF for v in range(10, 101, 10)])
+    t = time.perf_counter(); livret = create_pdf_booklet(lot); duree_livret = time.perf_counter() - t
+    return {
+        "pdf_par_seconde": n / duree, "pdf_octets": len(pdf), "pdf_pic_memoire_octets": pic,
+        "livret_recettes": len(lot), "livret_secondes": duree_livret, "livret_octets": len(livret)
+    }
+
+# --- 3. RERUNS DE L'APP ---
+def bench_app(repetitions=5):
+    from streamlit.testing.v1 import AppTest
+    chemin = os.path.join(RACINE, "app_biere.py")
+    os.chdir(RACINE)
+    mesures = {"premier_chargement": [], "generation": [], "bascule_arome": [], "curseur_abv": []}
+    for i in range(repetitions):
+        at = AppTest.from_file(chemin, default_timeout=60)
+        t = time.perf_counter(); at.run(); mesures["premier_chargement"].append(time.perf_counter() - t)
+        t = time.perf_counter(); at.button[0].click().run(); mesures["generation"].append(time.perf_counter() - t)
+        t = time.perf_counter(); at.toggle(key="t_🍊").set_value(True).run(); mesures["bascule_arome"].append(time.perf_counter() - t)
+        t = time.perf_counter(); at.slider(key="degre_vise").set_value(round(5.0 + 0.1 * i, 1)).run(); mesures["curseur_abv"].append(time.perf_counter() - t)
+        if at.exception: raise RuntimeError(f"Exception dans l'app : {at.exception}")
+    return {f"{nom}_ms": sorted(v)[len(v) // 2] * 1e3 for nom, v in mesures.items()}
+
+# --- COMPARAISON ---
+# Métriques où une valeur plus grande est meilleure ; pour toutes les autres (temps, octets), plus petit = mieux
+PLUS_GRAND_MIEUX = {"pdf_par_seconde"}
+
+def compare(actuel, reference, tolerance):
+    regressions = []
+    for couche, valeurs in actuel["resultats"].items():
+        for nom, valeur in valeurs.items():
+            ref = reference.get("resultats", {}).get(couche, {}).get(nom)
+            if not ref or nom in ("livret_recettes",): continue
+            ratio = ref / valeur if nom in PLUS_GRAND_MIEUX else valeur / ref
+            if ratio > 1 + tolerance: regressions.append(f"{couche}.{nom} : {ref:.4g} -> {valeur:.4g} (x{ratio:.2f})")
+    return regressions
+
+def metadata():
+    try: commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RACINE, capture_output=True, text=True).stdout.strip()
+    except OSError: commit = ""
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"), "commit": commit,
+        "python": platform.python_version(), "plateforme": platform.platform()
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--couches", nargs="+", default=["micro", "pdf", "app"], choices=["micro", "pdf", "app"])
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    parser.add_argument("--compare", help="JSON de référence ; code de sortie 1 en cas de régression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="écart relatif toléré avant de signaler une régression")
+    args = parser.parse_args()
+
+    fonctions = {"micro": bench_micro, "pdf": bench_pdf, "app": bench_app}
+    rapport = {"meta": metadata(), "resultats": {}}
+    for couche in args.couches:
+        rapport["resultats"][couche] = fonctions[couche]()
+        for nom, valeur in rapport["resultats"][couche].items(): print(f"{couche:>6} {nom:<28} {valeur:>14.4g}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: json.dump(rapport, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f: reference = json.load(f)
+        regressions = compare(rapport, reference, args.tolerance)
+        for r in regressions: print(f"RÉGRESSION {r}")
+        if regressions: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
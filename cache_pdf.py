@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# ==========================================
+# CACHE DES PDF (adressé par le contenu)
+# ==========================================
+# Clé = empreinte canonique de recette_data : deux reruns qui produisent la même
+# recette (ex. un arôme qui ne change aucun ingrédient) réutilisent le même PDF.
+# Niveau 1 : LRU en mémoire borné en nombre d'entrées.
+# Niveau 2 (optionnel) : fichiers <clé>.pdf dans un dossier, borné en octets.
+# Le dossier survit aux déploiements : VERSION_RENDU entre dans la clé et doit être incrémentée
+# à chaque changement de mise en page ou d'image de pdf_biere (logo, libellés, ...),
+# sans quoi les anciens PDF continuent d'être servis.
+
+VERSION_RENDU = 3
+
+def recipe_key(data):
+    # JSON trié : même recette (et même rendu) => mêmes octets, quel que soit l'ordre des clés
+    canon = json.dumps({"rendu": VERSION_RENDU, "recette": data}, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+class PdfCache:
+    def __init__(self, max_entries=128, disk_dir=None, disk_max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0; self.disk_hits = 0; self.misses = 0
+        self._disk_bytes = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(os.path.getsize(p) for p in self._disk_files())
+
+    # --- API ---
+    def get_or_create(self, data, builder):
+        # builder(data) -> bytes, appelé seulement en cas d'échec sur les deux niveaux
+        key = recipe_key(data)
+        pdf_bytes = self.get(key)
+        if pdf_bytes is None:
+            pdf_bytes = builder(data)
+            self.put(key, pdf_bytes)
+        return pdf_bytes
+
+    def deferred(self, data, builder):
+        # Fonction sans argument pour st.download_button(data=...) : le PDF n'est
+        # construit (ou lu dans le cache) qu'au clic sur le bouton, pas à chaque rerun.
+        return lambda: self.get_or_create(data, builder)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key); self.hits += 1
+                return self._mem[key]
+        pdf_bytes = self._disk_read(key)
+        with self._lock:
+            if pdf_bytes is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._mem_put(key, pdf_bytes)
+        return pdf_bytes
+
+    def put(self, key, pdf_bytes):
+        with self._lock:
+            self._mem_put(key, pdf_bytes)
+        self._disk_write(key, pdf_bytes)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0,
+                "entries": len(self._mem), "disk_bytes": self._disk_bytes
+            }
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            if self.disk_dir:
+                for p in self._disk_files(): os.remove(p)
+                self._disk_bytes = 0
+
+    # --- INTERNE ---
+    def _mem_put(self, key, pdf_bytes):
+        self._mem[key] = pdf_bytes; self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries: self._mem.popitem(last=False)
+
+    def _disk_path(self, key): return os.path.join(self.disk_dir, f"{key}.pdf")
+
+    def _disk_files(self):
+        return [os.path.join(self.disk_dir, f) for f in os.listdir(self.disk_dir) if f.endswith(".pdf")]
+
+    def _disk_read(self, key):
+        if not self.disk_dir: return None
+        chemin = self._disk_path(key)
+        try:
+            with open(chemin, "rb") as f: pdf_bytes = f.read()
+        except OSError:
+            return None
+        os.utime(chemin)  # mtime = dernier accès, sert à l'éviction
+        return pdf_bytes
+
+    def _disk_write(self, key, pdf_bytes):
+        if not self.disk_dir or len(pdf_bytes) > self.disk_max_bytes: return
+        chemin = self._disk_path(key)
+        if os.path.exists(chemin): return
+        # Écriture atomique : un autre processus ne lit jamais un fichier partiel
+        tmp = f"{chemin}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f: f.write(pdf_bytes)
+        os.replace(tmp, chemin)
+        with self._lock:
+            self._disk_bytes += len(pdf_bytes)
+            if self._disk_bytes > self.disk_max_bytes: self._disk_evict()
+
+    def _disk_evict(self):
+        # Supprime les fichiers les moins récemment utilisés jusqu'à repasser sous la limite
+        fichiers = []
+        for p in self._disk_files():
+            try: fichiers.append((os.path.getmtime(p), os.path.getsize(p), p))
+            except OSError: pass
+        fichiers.sort()
+        self._disk_bytes = sum(taille for _, taille, _ in fichiers)
+        for _, taille, p in fichiers:
+            if self._disk_bytes <= self.disk_max_bytes: break
+            try: os.remove(p)
+            except OSError: continue
+            self._disk_bytes -= taille
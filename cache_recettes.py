@@ -0,0 +1,84 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import moteur_biere
+
+# ==========================================
+# CACHE DE RECETTES PARTAGÉ ENTRE SESSIONS
+# ==========================================
+# Une instance par processus (st.cache_resource dans l'app) : toutes les sessions qui demandent
+# les mêmes réglages (ex. Blonde / 20 L / 6 % / Légère) partagent le même résultat.
+# Clé normalisée : (style, volume, abv, amertume, ensemble d'arômes) — l'ordre de sélection
+# des arômes n'influe pas sur la recette, il est seulement recopié dans le résultat.
+# Entrées limitées en nombre (LRU) et en durée (TTL) ; tout est vidé si MALTS_DB / HOPS_DB changent.
+# Les sources de compute() qui dépendent des bases (table précalculée) doivent suivre `empreinte` :
+# sinon le cache vidé se remplit à nouveau avec les mêmes recettes périmées.
+
+def db_fingerprint():
+    contenu = json.dumps([moteur_biere.MALTS_DB, moteur_biere.HOPS_DB], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()
+
+def recipe_key(style, volume, abv, bitterness, aromas):
+    return (style, volume, float(abv), bitterness, frozenset(aromas))
+
+class RecipeCache:
+    def __init__(self, ttl=3600, max_entries=10_000, check_interval=1.0, clock=time.monotonic):
+        # check_interval : délai minimal entre deux calculs de l'empreinte des bases (coût amorti)
+        self.ttl = ttl; self.max_entries = max_entries
+        self.check_interval = check_interval; self.clock = clock
+        self._entrees = OrderedDict()
+        self._lock = threading.Lock()
+        self._empreinte = db_fingerprint(); self._verifie_a = clock()
+        self.hits = 0; self.misses = 0; self.expirations = 0; self.evictions = 0; self.invalidations = 0
+
+    # --- API ---
+    def get_or_compute(self, style, volume, abv, bitterness, aromas, compute):
+        # compute() -> recette_data, appelé seulement en cas d'échec
+        cle = recipe_key(style, volume, abv, bitterness, aromas)
+        maintenant = self.clock()
+        with self._lock:
+            self._check_databases(maintenant)
+            entree = self._entrees.get(cle)
+            if entree is not None and entree[0] <= maintenant:
+                del self._entrees[cle]; self.expirations += 1; entree = None
+            if entree is not None:
+                self._entrees.move_to_end(cle); self.hits += 1
+                recette = entree[1]
+            else:
+                self.misses += 1; recette = None
+        if recette is None:
+            recette = compute()
+            with self._lock:
+                self._entrees[cle] = (maintenant + self.ttl, recette); self._entrees.move_to_end(cle)
+                while len(self._entrees) > self.max_entries:
+                    self._entrees.popitem(last=False); self.evictions += 1
+        # Copie de surface avec l'ordre d'arômes de l'appelant ; grains / houblons sont partagés (lecture seule)
+        return dict(recette, aromes=list(aromas))
+
+    @property
+    def empreinte(self): return self._empreinte  # empreinte des bases au dernier contrôle
+
+    def invalidate(self):
+        with self._lock:
+            self._entrees.clear(); self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entrees), "max_entries": self.max_entries, "ttl": self.ttl,
+                "expirations": self.expirations, "evictions": self.evictions, "invalidations": self.invalidations
+            }
+
+    # --- INTERNE ---
+    def _check_databases(self, maintenant):
+        if maintenant - self._verifie_a < self.check_interval: return
+        self._verifie_a = maintenant
+        empreinte = db_fingerprint()
+        if empreinte != self._empreinte:
+            self._empreinte = empreinte
+            self._entrees.clear(); self.invalidations += 1
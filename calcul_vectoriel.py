@@ -0,0 +1,142 @@
+import math
+from itertools import combinations
+
+import numpy as np
+
+from moteur_biere import (
+    AROMA_DATA, STYLES_DEF, IBU_MAP, EFFICACITE, MALTS_DB, HOPS_DB, resolve_ingredients
+)
+
+# ==========================================
+# CALCUL VECTORISÉ (NumPy)
+# ==========================================
+# Mêmes formules que moteur_biere, appliquées à des tableaux entiers.
+# L'ordre des opérations est recopié à l'identique pour obtenir les mêmes
+# flottants que les fonctions scalaires (arrondis et troncatures compris).
+
+# --- AXES DE L'ESPACE DES CURSEURS ---
+STYLES = list(STYLES_DEF.keys())
+VOLUMES = list(range(10, 101, 10))
+ABVS = [round(3.0 + i * 0.1, 1) for i in range(91)]
+AMERTUMES = list(IBU_MAP.keys())
+# 1 + 11 + 55 = 67 ensembles d'arômes (0, 1 ou 2 arômes)
+_EMOJIS = [e for e, _ in AROMA_DATA]
+AROMA_SETS = [()] + [(e,) for e in _EMOJIS] + list(combinations(_EMOJIS, 2))
+AROMA_SET_INDEX = {frozenset(s): i for i, s in enumerate(AROMA_SETS)}
+
+def aroma_set_index(aromes): return AROMA_SET_INDEX[frozenset(aromes)]
+
+# Facteurs de temps d'ébullition : constantes, calculés une seule fois en scalaire
+BOIL_FACT_60 = (1 - (math.e ** (-0.04 * 60))) / 4.15
+BOIL_FACT_5 = (1 - (math.e ** (-0.04 * 5))) / 4.15
+
+# --- NOYAUX VECTORISÉS ---
+def pow_exact(base, expo):
+    # np.power (SIMD) peut différer d'1 ulp du pow() de la libm utilisé par Python,
+    # ce qui suffit à décaler un int() : on applique ** sur les valeurs distinctes seulement
+    # (poids arrondis à 50 g, abv au dixième : elles sont peu nombreuses) puis on redistribue.
+    # L'un des deux opérandes doit être un scalaire.
+    if np.ndim(expo) == 0:
+        tableau = np.asarray(base, dtype=np.float64); f = lambda x: x ** float(expo)
+    else:
+        tableau = np.asarray(expo, dtype=np.float64); f = lambda x: float(base) ** x
+    uniques, inverse = np.unique(tableau, return_inverse=True)
+    valeurs = np.array([f(x) for x in uniques.tolist()], dtype=np.float64)
+    return valeurs[inverse].reshape(tableau.shape)
+
+def round_grain_v(poids): return np.rint(poids * 20) / 20
+def calc_og_from_abv_v(abv): return (abv / 131.25) + 1.010
+def calc_grain_weight_v(target_sg, volume, efficiency, malt_yield):
+    points = (target_sg - 1) * 1000
+    return (points * volume) / (malt_yield * efficiency * 3.83)
+def calc_hops_weight_v(target_ibu, alpha_acid, boil_fact, volume_l, boil_gravity):
+    # boil_fact est passé déjà calculé (BOIL_FACT_60 / BOIL_FACT_5)
+    bigness = 1.65 * pow_exact(0.000125, boil_gravity - 1)
+    utilization = bigness * boil_fact
+    with np.errstate(divide='ignore', invalid='ignore'):
+        poids = (target_ibu * volume_l) / (utilization * (alpha_acid/100) * 1000)
+    return np.where(utilization == 0, 0.0, poids)
+def estimate_color_v(poids_base, ebc_base, poids_spe, ebc_spe, volume):
+    mcu = (poids_base * ebc_base) / volume + (poids_spe * ebc_spe) / volume
+    return 2.93 * pow_exact(mcu * 4.23, 0.6859)
+
+# --- TABLE DES COMBINAISONS (style, ensemble d'arômes) ---
+def build_combos():
+    # Résolution scalaire des 7 x 67 combinaisons ; les calculs vectoriels ne font ensuite que des gathers.
+    noms = []
+    avg_yield = np.empty((len(STYLES), len(AROMA_SETS)))
+    ratio_base = np.empty_like(avg_yield); ratio_spe = np.empty_like(avg_yield)
+    ebc_base = np.empty_like(avg_yield); ebc_spe = np.empty_like(avg_yield)
+    aa_amer = np.empty_like(avg_yield); aa_arome = np.empty_like(avg_yield)
+    for s, style in enumerate(STYLES):
+        ligne = []
+        for a, aromes in enumerate(AROMA_SETS):
+            ing = resolve_ingredients(style, aromes)
+            ligne.append(ing)
+            ratio_base[s, a] = ing["ratio_base"]; ratio_spe[s, a] = ing["ratio_spe"]
+            avg_yield[s, a] = (MALTS_DB.get(ing["malt_base"], {"yield":78})['yield'] * ing["ratio_base"]) + (MALTS_DB.get(ing["malt_spe"], {"yield":75})['yield'] * ing["ratio_spe"])
+            ebc_base[s, a] = MALTS_DB.get(ing["malt_base"], {'ebc':4})['ebc']; ebc_spe[s, a] = MALTS_DB.get(ing["malt_spe"], {'ebc':4})['ebc']
+            aa_amer[s, a] = HOPS_DB.get(ing["houblon_amer"], {'aa':10})['aa']; aa_arome[s, a] = HOPS_DB.get(ing["houblon_arome"], {'aa':5})['aa']
+        noms.append(ligne)
+    return {
+        "ingredients": noms, "avg_yield": avg_yield, "ratio_base": ratio_base, "ratio_spe": ratio_spe,
+        "ebc_base": ebc_base, "ebc_spe": ebc_spe, "aa_amer": aa_amer, "aa_arome": aa_arome
+    }
+
+_COMBOS = None
+def get_combos():
+    global _COMBOS
+    if _COMBOS is None: _COMBOS = build_combos()
+    return _COMBOS
+
+# --- CALCUL PAR LOT ---
+def compute_arrays(style_idx, volume, abv, ibu, aroma_idx):
+    # Entrées : tableaux de même forme (indices dans STYLES / AROMA_SETS, volume en L, abv en %, ibu cible).
+    # Sorties : tableaux des valeurs numériques de recette_data (poids de houblon tronqués comme int()).
+    c = get_combos()
+    style_idx = np.asarray(style_idx); aroma_idx = np.asarray(aroma_idx)
+    volume = np.asarray(volume, dtype=np.float64); abv = np.asarray(abv, dtype=np.float64); ibu = np.asarray(ibu, dtype=np.float64)
+
+    target_og = calc_og_from_abv_v(abv)
+    total_grain_mass = calc_grain_weight_v(target_og, volume, EFFICACITE, c["avg_yield"][style_idx, aroma_idx])
+    poids_base = round_grain_v(total_grain_mass * c["ratio_base"][style_idx, aroma_idx])
+    poids_spe = round_grain_v(total_grain_mass * c["ratio_spe"][style_idx, aroma_idx])
+    total_grain_affiche = poids_base + poids_spe
+    ebc = estimate_color_v(poids_base, c["ebc_base"][style_idx, aroma_idx], poids_spe, c["ebc_spe"][style_idx, aroma_idx], volume)
+    boil_gravity = target_og * 0.85
+    grammes_amer = calc_hops_weight_v(ibu * 0.8, c["aa_amer"][style_idx, aroma_idx], BOIL_FACT_60, volume, boil_gravity)
+    grammes_arome = calc_hops_weight_v(ibu * 0.2, c["aa_arome"][style_idx, aroma_idx], BOIL_FACT_5, volume, boil_gravity)
+    eau_emp = total_grain_affiche * 3.0
+    eau_rinc = np.maximum((volume * 1.15 + total_grain_affiche) - eau_emp, 0)
+
+    return {
+        "og": target_og, "ebc": ebc, "poids_base": poids_base, "poids_spe": poids_spe,
+        "grammes_amer": np.trunc(grammes_amer).astype(np.int64), "grammes_arome": np.trunc(grammes_arome).astype(np.int64),
+        "eau_emp": eau_emp, "eau_rinc": eau_rinc
+    }
+
+def sweep_grid():
+    # Grille complète des curseurs, aplatie dans l'ordre (style, volume, abv, amertume, arômes)
+    s, v, a, b, r = np.meshgrid(
+        np.arange(len(STYLES)), np.array(VOLUMES), np.array(ABVS),
+        np.array([IBU_MAP[k] for k in AMERTUMES]), np.arange(len(AROMA_SETS)), indexing='ij'
+    )
+    return s.ravel(), v.ravel(), a.ravel(), b.ravel(), r.ravel()
+
+def compute_sweep():
+    grille = sweep_grid()
+    return grille, compute_arrays(*grille)
+
+def recipe_from_arrays(res, i, style_idx, volume, abv, ibu, aroma_idx, aromes=None):
+    # Reconstitue le dict recette_data de la ligne i (aromes : ordre de sélection à conserver, sinon ordre canonique)
+    s = int(style_idx[i]); a = int(aroma_idx[i])
+    ing = get_combos()["ingredients"][s][a]
+    vol = volume[i].item(); ibu_i = ibu[i].item()
+    return {
+        "style": STYLES[s], "aromes": list(AROMA_SETS[a] if aromes is None else aromes), "volume": int(vol) if float(vol).is_integer() else vol,
+        "abv": abv[i].item(), "og": res["og"][i].item(), "ibu": int(ibu_i) if float(ibu_i).is_integer() else ibu_i, "ebc": res["ebc"][i].item(), "eff": EFFICACITE,
+        "grains": [{"nom": ing["malt_base"], "poids": res["poids_base"][i].item(), "ratio": ing["ratio_base"]}, {"nom": ing["malt_spe"], "poids": res["poids_spe"][i].item(), "ratio": ing["ratio_spe"]}],
+        "houblons": [{"nom": ing["houblon_amer"], "poids": int(res["grammes_amer"][i]), "usage": "Ebu 60min", "aa": HOPS_DB.get(ing["houblon_amer"], {'aa':10})['aa']},
+                     {"nom": ing["houblon_arome"], "poids": int(res["grammes_arome"][i]), "usage": "Arome 5min", "aa": HOPS_DB.get(ing["houblon_arome"], {'aa':5})['aa']}],
+        "eau_emp": res["eau_emp"][i].item(), "eau_rinc": res["eau_rinc"][i].item(), "levure": ing["levure"]
+    }
@@ -0,0 +1,149 @@
+import csv
+import heapq
+import os
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+
+# ==========================================
+# CATALOGUE DES BIÈRES DU COMMERCE (bieres.csv)
+# ==========================================
+# Chargé une fois par processus en colonnes compactes :
+#   - textes internés (types, mots-clés d'arômes) et remplacés par des codes entiers
+#   - degrés dans un array('f'), arômes de chaque bière dans un array('I') à plat + offsets
+# Deux index :
+#   - index ABV      ids triés par degré + degrés triés, interrogé par bisect
+#   - index inversé  mot-clé d'arôme normalisé -> rangs des bières dans l'ordre ABV (array('I'), triés) :
+#                    la restriction d'une liste à une fenêtre de degrés est donc elle aussi un bisect
+# Le CSV est lu en flux (csv.reader) : un flux distributeur de plusieurs centaines de
+# milliers de lignes ne passe jamais entièrement en mémoire sous forme de dicts.
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bieres.csv")
+
+def normalize_keyword(mot):
+    # "Épices" == "epices" == " EPICES "
+    mot = unicodedata.normalize("NFKD", mot.strip().casefold())
+    return "".join(c for c in mot if not unicodedata.combining(c))
+
+class BeerCatalog:
+    def __init__(self):
+        self.noms = []; self.descriptions = []; self.liens = []
+        self.types = []; self.type_codes = array("B")
+        self.degres = array("f")
+        self.mots = []; self._mot_code = {}; self._brut_code = {}
+        self.aromes_flat = array("I"); self.aromes_offsets = array("I", [0])
+        self.index_aromes = {}
+        self.abv_ids = array("I"); self.abv_sorted = array("f")
+
+    def __len__(self): return len(self.noms)
+
+    # --- CHARGEMENT ---
+    @classmethod
+    def from_csv(cls, chemin=CSV_PATH):
+        cat = cls()
+        type_code = {}
+        with open(chemin, encoding="utf-8-sig", newline="") as f:
+            lecteur = csv.reader(f, delimiter=";")
+            entete = next(lecteur)
+            col = {nom: i for i, nom in enumerate(entete)}
+            i_nom, i_type, i_deg, i_desc, i_aro = col["Nom"], col["Type"], col["Degre"], col["Description"], col["Aromes"]
+            i_lien = col.get("Lien_Achat")
+            for ligne in lecteur:
+                if not ligne or not ligne[i_nom].strip(): continue
+                try: degre = float(ligne[i_deg].replace(",", "."))
+                except ValueError: continue
+                cat.noms.append(ligne[i_nom].strip())
+                cat.descriptions.append(ligne[i_desc].strip())
+                lien = ligne[i_lien].strip() if i_lien is not None and i_lien < len(ligne) else ""
+                cat.liens.append(lien)
+                t = ligne[i_type].strip()
+                if t not in type_code: type_code[t] = len(cat.types); cat.types.append(t)
+                cat.type_codes.append(type_code[t])
+                cat.degres.append(degre)
+                for mot in ligne[i_aro].split(","):
+                    if mot.strip(): cat.aromes_flat.append(cat._intern(mot.strip()))
+                cat.aromes_offsets.append(len(cat.aromes_flat))
+        cat._build_indexes()
+        return cat
+
+    def _intern(self, mot):
+        code = self._brut_code.get(mot)
+        if code is not None: return code
+        cle = normalize_keyword(mot)
+        code = self._mot_code.get(cle)
+        if code is None:
+            code = self._mot_code[cle] = len(self.mots); self.mots.append(mot)
+        self._brut_code[mot] = code
+        return code
+
+    def _build_indexes(self):
+        ordre = sorted(range(len(self.noms)), key=self.degres.__getitem__)
+        self.abv_ids = array("I", ordre)
+        self.abv_sorted = array("f", (self.degres[i] for i in ordre))
+        postings = [array("I") for _ in self.mots]
+        for rang, i in enumerate(ordre):
+            for code in set(self.aromes_codes(i)): postings[code].append(rang)
+        self.index_aromes = {normalize_keyword(mot): postings[code] for code, mot in enumerate(self.mots)}
+        self._brut_code = {}
+
+    # --- ACCÈS ---
+    def aromes_codes(self, i): return self.aromes_flat[self.aromes_offsets[i]:self.aromes_offsets[i + 1]]
+    def type_of(self, i): return self.types[self.type_codes[i]]
+
+    def beer(self, i):
+        return {
+            "nom": self.noms[i], "type": self.type_of(i), "degre": round(self.degres[i], 2), "description": self.descriptions[i],
+            "aromes": [self.mots[c] for c in self.aromes_codes(i)], "lien": self.liens[i]
+        }
+
+    def with_aroma(self, mot):
+        # ids des bières portant ce mot-clé, par degré croissant
+        return [self.abv_ids[r] for r in self.index_aromes.get(normalize_keyword(mot), ())]
+
+    def by_abv(self, mini, maxi):
+        # ids des bières dont le degré est dans [mini, maxi]
+        return self.abv_ids[bisect_left(self.abv_sorted, mini):bisect_right(self.abv_sorted, maxi)]
+
+    # --- RECHERCHE ---
+    def similar(self, aromes, abv, style=None, k=3, tolerance=1.5):
+        # aromes : noms (ex. ["Agrumes", "Pin"]). Classement : arômes communs, puis même type, puis écart de degré.
+        # Candidats : bières partageant au moins un arôme dans [abv ± tolerance] (à défaut, à n'importe quel degré) ;
+        # sans arôme commun, toutes les bières dans [abv ± tolerance].
+        postings = [self.index_aromes[m] for m in map(normalize_keyword, aromes) if m in self.index_aromes]
+        lo_t = bisect_left(self.abv_sorted, abv - tolerance); hi_t = bisect_right(self.abv_sorted, abv + tolerance)
+        if postings:
+            rangs = self._search(postings, len(aromes), lo_t, hi_t, abv, style, k) or self._search(postings, len(aromes), 0, len(self), abv, style, k)
+        else:
+            rangs = self._search(None, 0, lo_t, hi_t, abv, style, k)
+        return [self.beer(self.abv_ids[r]) for r in rangs]
+
+    def _search(self, postings, n_aromes, lo_t, hi_t, abv, style, k):
+        # Fenêtre de rangs autour du degré visé, élargie (x4) jusqu'à contenir k bières du meilleur niveau possible
+        # (tous les arômes + même type) dont la k-ième est strictement plus proche en degré que toute bière hors
+        # fenêtre : la fenêtre grandit en rang, pas en degré, le côté dense peut cacher un voisin plus proche.
+        # Le résultat est alors identique à un parcours complet de [lo_t, hi_t) (égalités départagées par rang).
+        centre = bisect_left(self.abv_sorted, abv); largeur = 256
+        while True:
+            lo = max(lo_t, centre - largeur); hi = min(hi_t, centre + largeur)
+            communs = {}
+            if postings is None:
+                candidats = range(lo, hi)
+            else:
+                for post in postings:
+                    for r in post[bisect_left(post, lo):bisect_left(post, hi)]: communs[r] = communs.get(r, 0) + 1
+                candidats = communs
+            cle = lambda r: (-communs.get(r, 0), self.type_of(self.abv_ids[r]) != style, abs(self.abv_sorted[r] - abv), r)
+            meilleurs = heapq.nsmallest(k, candidats, key=cle)
+            if lo == lo_t and hi == hi_t: return meilleurs
+            if len(meilleurs) == k:
+                dernier = cle(meilleurs[-1])
+                bord = min(abv - self.abv_sorted[lo - 1] if lo > lo_t else float("inf"), self.abv_sorted[hi] - abv if hi < hi_t else float("inf"))
+                if dernier[0] == -n_aromes and not dernier[1] and dernier[2] < bord: return meilleurs
+            largeur *= 4
+
+_CATALOGUES = {}
+def load_catalog(chemin=CSV_PATH):
+    # Un chargement par processus et par fichier
+    cat = _CATALOGUES.get(chemin)
+    if cat is None: cat = _CATALOGUES[chemin] = BeerCatalog.from_csv(chemin)
+    return cat
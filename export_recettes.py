@@ -0,0 +1,223 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from moteur_biere import AROMA_DICT, IBU_MAP, EFFICACITE
+import calcul_vectoriel as cv
+
+# ==========================================
+# EXPORT EN MASSE DES RECETTES (CSV / JSONL / PARQUET)
+# ==========================================
+# Une grille = un produit cartésien d'axes (styles, volumes, abv, amertumes, ensembles d'arômes),
+# jamais matérialisé : chaque bloc de TAILLE_BLOC lignes est retrouvé par np.unravel_index sur un
+# intervalle d'indices plats, calculé par calcul_vectoriel.compute_arrays, écrit puis libéré.
+# La mémoire ne dépend que de la taille du bloc, pas du nombre de lignes.
+# --shards N découpe l'intervalle en N fichiers contigus, écrits en parallèle par --processus.
+#
+# Une ligne = les champs de recette_data à plat (grains[0] = base, grains[1] = spécial,
+# houblons[0] = amérisant, houblons[1] = aromatique) ; "aromes" est une liste en JSONL / Parquet,
+# des émojis joints par "+" en CSV.
+# Parquet demande pyarrow (optionnel, pip install pyarrow).
+#
+# python export_recettes.py recettes.parquet [--styles IPA Stout] [--volumes 20:60:10] [--abv 4:8:0.5]
+#        [--amertumes Forte 45] [--aromes tous | "" "🍊" "Agrumes+Pin"] [--shards 8 --processus 4]
+
+TAILLE_BLOC = 65_536
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".parquet": "parquet"}
+COLONNES = [
+    "style", "aromes", "volume", "abv", "og", "ibu", "ebc", "eff",
+    "malt_base", "poids_base", "ratio_base", "malt_spe", "poids_spe", "ratio_spe",
+    "houblon_amer", "grammes_amer", "aa_amer", "houblon_arome", "grammes_arome", "aa_arome",
+    "eau_emp", "eau_rinc", "levure"
+]
+_NOMS_AROMES = {nom: e for e, nom in AROMA_DICT.items()}
+
+# --- GRILLE ---
+def parse_axis(valeurs, conversion=float):
+    # ["10", "20"] ou ["10:100:10"] (bornes incluses) -> liste ; le pas fixe l'arrondi (0.1 -> 1 décimale),
+    # comme les curseurs de l'app : "3:12:0.1" redonne exactement cv.ABVS
+    sortie = []
+    for v in valeurs:
+        if ":" not in v: sortie.append(conversion(v)); continue
+        debut, fin, pas = (v.split(":") + ["1"])[:3]
+        decimales = len(pas.partition(".")[2]); debut, fin, pas = float(debut), float(fin), float(pas)
+        n = int(round((fin - debut) / pas)) + 1
+        sortie += [conversion(round(debut + i * pas, decimales)) for i in range(n) if round(debut + i * pas, decimales) <= fin]
+    return sortie
+
+def _nombre(v):
+    f = float(v); return int(f) if f.is_integer() else f
+
+def parse_aroma_set(texte):
+    # "" / "aucun" -> () ; "🍊+🌲" ou "Agrumes+Pin" -> indice dans cv.AROMA_SETS (0, 1 ou 2 arômes)
+    if texte in ("", "aucun"): return cv.aroma_set_index(())
+    aromes = [_NOMS_AROMES.get(t.strip(), t.strip()) for t in texte.split("+")]
+    try: return cv.aroma_set_index(aromes)
+    except KeyError: raise ValueError(f"ensemble d'arômes inconnu : {texte!r}") from None
+
+def make_grid(styles=None, volumes=None, abvs=None, amertumes=None, aromes=None):
+    # None = axe complet de l'app ; amertumes : niveaux de IBU_MAP ou IBU numériques ; aromes : textes de parse_aroma_set
+    inconnus = [s for s in styles or () if s not in cv.STYLES]
+    if inconnus: raise ValueError(f"styles inconnus : {', '.join(inconnus)}")
+    return {
+        "styles": [cv.STYLES.index(s) for s in styles] if styles else list(range(len(cv.STYLES))),
+        "volumes": list(volumes or cv.VOLUMES), "abvs": list(abvs or cv.ABVS),
+        "ibus": [IBU_MAP[a] if a in IBU_MAP else _nombre(a) for a in amertumes] if amertumes else [IBU_MAP[k] for k in cv.AMERTUMES],
+        "aromes": [parse_aroma_set(a) for a in aromes] if aromes is not None else list(range(len(cv.AROMA_SETS)))
+    }
+
+def grid_shape(grille): return tuple(len(grille[axe]) for axe in ("styles", "volumes", "abvs", "ibus", "aromes"))
+def grid_size(grille): return int(np.prod(grid_shape(grille), dtype=np.int64))
+
+# --- CALCUL D'UN BLOC ---
+_INGREDIENTS = None
+def _ingredient_arrays():
+    # Noms (style x arômes) en tableaux d'objets : le bloc les récupère par un simple gather
+    global _INGREDIENTS
+    if _INGREDIENTS is None:
+        c = cv.get_combos()
+        _INGREDIENTS = {
+            champ: np.array([[ing[champ] for ing in ligne] for ligne in c["ingredients"]], dtype=object)
+            for champ in ("malt_base", "malt_spe", "houblon_amer", "houblon_arome", "levure")
+        }
+    return _INGREDIENTS
+
+def _axis_array(valeurs):
+    return np.array(valeurs, dtype=np.int64 if all(float(v).is_integer() for v in valeurs) else np.float64)
+
+def compute_chunk(grille, debut, fin):
+    # Lignes [debut, fin) de la grille aplatie (ordre style, volume, abv, amertume, arômes) -> {colonne: tableau}
+    s, v, a, b, r = np.unravel_index(np.arange(debut, fin), grid_shape(grille))
+    style_idx = np.asarray(grille["styles"])[s]; aroma_idx = np.asarray(grille["aromes"])[r]
+    volume = _axis_array(grille["volumes"])[v]; abv = np.asarray(grille["abvs"], dtype=np.float64)[a]; ibu = _axis_array(grille["ibus"])[b]
+    res = cv.compute_arrays(style_idx, volume, abv, ibu, aroma_idx)
+    c = cv.get_combos(); noms = _ingredient_arrays()
+    return {
+        "style": np.array(cv.STYLES, dtype=object)[style_idx], "aromes": aroma_idx, "volume": volume, "abv": abv,
+        "og": res["og"], "ibu": ibu, "ebc": res["ebc"], "eff": np.full(len(s), EFFICACITE),
+        "malt_base": noms["malt_base"][style_idx, aroma_idx], "poids_base": res["poids_base"], "ratio_base": c["ratio_base"][style_idx, aroma_idx],
+        "malt_spe": noms["malt_spe"][style_idx, aroma_idx], "poids_spe": res["poids_spe"], "ratio_spe": c["ratio_spe"][style_idx, aroma_idx],
+        "houblon_amer": noms["houblon_amer"][style_idx, aroma_idx], "grammes_amer": res["grammes_amer"], "aa_amer": c["aa_amer"][style_idx, aroma_idx],
+        "houblon_arome": noms["houblon_arome"][style_idx, aroma_idx], "grammes_arome": res["grammes_arome"], "aa_arome": c["aa_arome"][style_idx, aroma_idx],
+        "eau_emp": res["eau_emp"], "eau_rinc": res["eau_rinc"], "levure": noms["levure"][style_idx, aroma_idx]
+    }
+
+def _text_column(colonne, encode=str):
+    # Chaque valeur distincte n'est formatée qu'une fois puis redistribuée : un bloc ne contient que quelques
+    # centaines de poids, d'EBC ou de volumes d'eau différents (str(float) = repr, le plus court exact)
+    uniques, inverse = np.unique(colonne, return_inverse=True)
+    return np.array([encode(x) for x in uniques.tolist()], dtype=object)[inverse].tolist()
+
+# --- ÉCRIVAINS ---
+class CsvWriter:
+    def __init__(self, f):
+        self.writer = csv.writer(f, lineterminator="\n"); self.writer.writerow(COLONNES)
+
+    def write(self, bloc):
+        encodeurs = {"aromes": lambda a: "+".join(cv.AROMA_SETS[a])}
+        self.writer.writerows(zip(*(_text_column(bloc[nom], encodeurs.get(nom, str)) for nom in COLONNES)))
+
+    def close(self): pass
+
+class JsonlWriter:
+    # Lignes remplies dans un gabarit à partir des valeurs déjà encodées en JSON (même sortie que json.dumps)
+    def __init__(self, f):
+        self.f = f; self.gabarit = "{" + ", ".join(f"{json.dumps(nom)}: %s" for nom in COLONNES) + "}\n"
+
+    def write(self, bloc):
+        encodeurs = {"aromes": lambda a: json.dumps(list(cv.AROMA_SETS[a]), ensure_ascii=False)}
+        texte = lambda x: json.dumps(x, ensure_ascii=False) if isinstance(x, str) else str(x)
+        colonnes = [_text_column(bloc[nom], encodeurs.get(nom, texte)) for nom in COLONNES]
+        self.f.writelines(self.gabarit % ligne for ligne in zip(*colonnes))
+
+    def close(self): pass
+
+class ParquetWriter:
+    # Un bloc = un row group ; "aromes" en liste de chaînes (les 67 ensembles construits une fois, puis take)
+    def __init__(self, chemin):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("l'export Parquet demande pyarrow (pip install pyarrow)") from None
+        self.pa = pa; self.pq = pq; self.chemin = chemin; self.writer = None
+        self.aromes = pa.array([list(s) for s in cv.AROMA_SETS], type=pa.list_(pa.string()))
+
+    def write(self, bloc):
+        pa = self.pa
+        colonnes = [self.aromes.take(pa.array(bloc[nom])) if nom == "aromes" else pa.array(bloc[nom], type=pa.string() if bloc[nom].dtype == object else None) for nom in COLONNES]
+        table = pa.Table.from_arrays(colonnes, names=COLONNES)
+        if self.writer is None: self.writer = self.pq.ParquetWriter(self.chemin, table.schema, compression="zstd")
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None: self.writer.close()
+
+def detect_format(chemin, format_=None):
+    if format_: return format_
+    ext = os.path.splitext(chemin)[1].lower()
+    if ext not in FORMATS: raise ValueError(f"format introuvable pour {chemin!r} : préciser --format ({', '.join(FORMATS.values())})")
+    return FORMATS[ext]
+
+# --- EXPORT ---
+def export_range(grille, debut, fin, chemin, format_, taille_bloc=TAILLE_BLOC):
+    # Écrit les lignes [debut, fin) dans chemin ("-" = sortie standard, CSV / JSONL) ; renvoie le nombre de lignes
+    if format_ == "parquet":
+        if chemin == "-": raise ValueError("Parquet ne s'écrit pas sur la sortie standard")
+        f = None; writer = ParquetWriter(chemin)
+    else:
+        f = sys.stdout if chemin == "-" else open(chemin, "w", encoding="utf-8", newline="")
+        writer = (CsvWriter if format_ == "csv" else JsonlWriter)(f)
+    try:
+        for a in range(debut, fin, taille_bloc): writer.write(compute_chunk(grille, a, min(a + taille_bloc, fin)))
+        writer.close()
+    finally:
+        if f is not None and f is not sys.stdout: f.close()
+    return fin - debut
+
+def shard_paths(chemin, shards):
+    if shards == 1: return [chemin]
+    racine, ext = os.path.splitext(chemin)
+    return [f"{racine}-{k:05d}-of-{shards:05d}{ext}" for k in range(shards)]
+
+def _export_shard(args): return export_range(*args)
+
+def export_grid(grille, chemin, format_=None, taille_bloc=TAILLE_BLOC, shards=1, processus=None):
+    # -> [(chemin, lignes)] ; shards > 1 : intervalles contigus, dans l'ordre de la grille
+    format_ = detect_format(chemin, format_); n = grid_size(grille)
+    if shards > 1 and chemin == "-": raise ValueError("plusieurs shards ne s'écrivent pas sur la sortie standard")
+    chemins = shard_paths(chemin, shards)
+    taches = [(grille, k * n // shards, (k + 1) * n // shards, p, format_, taille_bloc) for k, p in enumerate(chemins)]
+    if shards == 1 or processus == 1: lignes = [_export_shard(t) for t in taches]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processus or os.cpu_count() or 1, shards)) as pool: lignes = list(pool.map(_export_shard, taches))
+    return list(zip(chemins, lignes))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export en masse des recettes d'une grille de paramètres")
+    parser.add_argument("sortie", help="fichier .csv / .jsonl / .parquet, ou - (sortie standard)")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())))
+    parser.add_argument("--styles", nargs="+"); parser.add_argument("--volumes", nargs="+"); parser.add_argument("--abv", nargs="+")
+    parser.add_argument("--amertumes", nargs="+", help="niveaux (Légère, Forte, ...) ou IBU numériques")
+    parser.add_argument("--aromes", nargs="*", help='ensembles "🍊+🌲" / "Agrumes+Pin", "" = sans arôme ; défaut : les 67')
+    parser.add_argument("--taille-bloc", type=int, default=TAILLE_BLOC)
+    parser.add_argument("--shards", type=int, default=1); parser.add_argument("--processus", type=int)
+    args = parser.parse_args()
+
+    grille = make_grid(
+        args.styles, parse_axis(args.volumes, _nombre) if args.volumes else None, parse_axis(args.abv) if args.abv else None,
+        args.amertumes and [x for a in args.amertumes for x in ([a] if a in IBU_MAP else parse_axis([a], _nombre))],
+        None if args.aromes in (None, ["tous"]) else args.aromes
+    )
+    t = time.perf_counter()
+    fichiers = export_grid(grille, args.sortie, args.format, args.taille_bloc, args.shards, args.processus)
+    duree = time.perf_counter() - t; total = sum(n for _, n in fichiers)
+    if args.sortie != "-":
+        for chemin, n in fichiers: print(f"{chemin}: {n} lignes ({os.path.getsize(chemin) / 1e6:.1f} Mo)")
+        print(f"{total} recettes en {duree:.2f} s ({total / max(duree, 1e-9):,.0f} lignes/s)")
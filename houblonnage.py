@@ -0,0 +1,108 @@
+import math
+import threading
+
+import numpy as np
+
+from moteur_biere import HOPS_DB
+
+# ==========================================
+# PLANNINGS DE HOUBLONNAGE & TABLE D'UTILISATION (gravité x temps)
+# ==========================================
+# calc_hops_weight recalcule 0.000125 ** (g - 1) et e ** (-0.04 t) à chaque ajout. Ici l'utilisation
+# Tinseth bigness(g) * boil_factor(t) est tabulée une fois pour tout le processus, puis lue par
+# interpolation bilinéaire : évaluer un planning de 10 ajouts sur 10 000 gravités = un gather.
+#
+# Types d'ajout (clé "type" d'un ajout) :
+#   ebullition    "temps" minutes d'ébullition
+#   premier_mout  houblon ajouté avant l'ébullition (FWH) : toute l'ébullition, +10 % d'IBU
+#   whirlpool     "temps" minutes à "temperature" °C après l'arrêt du feu (hop stand) ; la vitesse
+#                 d'isomérisation suit la loi d'Arrhenius de Malowicki (1,0 à 100 °C, ~0,23 à 80 °C)
+#                 et se traduit en minutes d'ébullition équivalentes
+#   dry_hop       à froid : aucune isomérisation, 0 IBU
+
+GRAVITE_MIN, GRAVITE_MAX, PAS_GRAVITE = 0.80, 1.20, 0.001
+TEMPS_MAX, PAS_TEMPS = 180.0, 0.5
+BONUS_PREMIER_MOUT = 1.10
+TYPES = ("ebullition", "premier_mout", "whirlpool", "dry_hop")
+
+# --- TABLE ---
+class UtilizationTable:
+    def __init__(self):
+        self.gravites = GRAVITE_MIN + PAS_GRAVITE * np.arange(round((GRAVITE_MAX - GRAVITE_MIN) / PAS_GRAVITE) + 1)
+        self.temps = PAS_TEMPS * np.arange(round(TEMPS_MAX / PAS_TEMPS) + 1)
+        bigness = 1.65 * (0.000125 ** (self.gravites - 1))
+        boil_fact = (1 - np.exp(-0.04 * self.temps)) / 4.15
+        self.table = np.outer(bigness, boil_fact)        # (gravités, temps), ~1,2 Mo
+        self.table.flags.writeable = False
+
+    def lookup(self, gravite, minutes):
+        # Interpolation bilinéaire, entrées diffusables (broadcast) ; bornées aux limites de la table
+        i, fi = self._position(gravite, GRAVITE_MIN, PAS_GRAVITE, len(self.gravites))
+        j, fj = self._position(minutes, 0.0, PAS_TEMPS, len(self.temps))
+        T = self.table
+        return (T[i, j] * (1 - fi) + T[i + 1, j] * fi) * (1 - fj) + (T[i, j + 1] * (1 - fi) + T[i + 1, j + 1] * fi) * fj
+
+    @staticmethod
+    def _position(x, origine, pas, n):
+        pos = np.clip((np.asarray(x, dtype=np.float64) - origine) / pas, 0, n - 1)
+        k = np.minimum(pos.astype(np.intp), n - 2)
+        return k, pos - k
+
+_TABLE = None
+_lock = threading.Lock()
+def get_table():
+    global _TABLE
+    if _TABLE is None:
+        with _lock:
+            if _TABLE is None: _TABLE = UtilizationTable()
+    return _TABLE
+
+def utilization(gravite, minutes): return get_table().lookup(gravite, minutes)
+
+# --- AJOUTS ---
+def temperature_factor(temperature):
+    # Vitesse d'isomérisation relative à 100 °C (Malowicki : 2,39e11 * e^(-9773 / T))
+    return 2.39e11 * math.exp(-9773 / (temperature + 273.15))
+
+def effective_minutes(ajout, duree_ebullition=60):
+    # Minutes d'ébullition équivalentes et coefficient multiplicatif de l'ajout
+    type_ajout = ajout.get("type", "ebullition")
+    if type_ajout == "ebullition": return min(ajout["temps"], duree_ebullition), 1.0
+    if type_ajout == "premier_mout": return duree_ebullition, BONUS_PREMIER_MOUT
+    if type_ajout == "whirlpool": return ajout["temps"] * temperature_factor(ajout.get("temperature", 80)), 1.0
+    if type_ajout == "dry_hop": return 0.0, 0.0
+    raise ValueError(f"type d'ajout inconnu : {type_ajout!r}")
+
+def usage_label(ajout):
+    # Libellé pour l'affichage et le PDF ("Ebu 60min", "Arome 5min", ...), dans l'esprit du moteur
+    type_ajout = ajout.get("type", "ebullition")
+    if type_ajout == "premier_mout": return "Premier moût"
+    if type_ajout == "whirlpool": return f"Whirlpool {ajout['temps']}min {ajout.get('temperature', 80)}C"
+    if type_ajout == "dry_hop": return f"Dry hop {ajout.get('jours', 3)}j"
+    return f"Ebu {ajout['temps']}min" if ajout["temps"] >= 30 else f"Arome {ajout['temps']}min"
+
+# --- PLANNING ---
+def schedule_arrays(ajouts, duree_ebullition=60):
+    # Planning -> tableaux (M,) : minutes équivalentes, coefficient, aa ; calculés une fois par planning
+    minutes, coef = zip(*(effective_minutes(a, duree_ebullition) for a in ajouts)) if ajouts else ((), ())
+    aa = [a.get("aa", HOPS_DB.get(a.get("nom"), {"aa": 10})["aa"]) for a in ajouts]
+    return np.array(minutes, dtype=np.float64), np.array(coef, dtype=np.float64), np.array(aa, dtype=np.float64)
+
+def ibu_per_gram(ajouts, volume, boil_gravity, duree_ebullition=60):
+    # IBU apporté par gramme de chaque ajout ; boil_gravity scalaire ou tableau (G,) -> (M,) ou (G, M)
+    minutes, coef, aa = schedule_arrays(ajouts, duree_ebullition)
+    g = np.asarray(boil_gravity, dtype=np.float64)[..., None]
+    return utilization(g, minutes) * coef * aa / 100 * 1000 / volume
+
+def schedule_ibu(ajouts, volume, boil_gravity, duree_ebullition=60):
+    # ajouts : [{"nom", "poids" (g), "type", "temps", "temperature"}] -> IBU par ajout, même forme que ibu_per_gram
+    poids = np.array([a["poids"] for a in ajouts], dtype=np.float64)
+    return ibu_per_gram(ajouts, volume, boil_gravity, duree_ebullition) * poids
+
+def total_ibu(ajouts, volume, boil_gravity, duree_ebullition=60):
+    return schedule_ibu(ajouts, volume, boil_gravity, duree_ebullition).sum(-1)
+
+def weights_for_ibu(ajouts, ibu_cibles, volume, boil_gravity, duree_ebullition=60):
+    # Inverse : grammes par ajout pour les IBU visés (0 g pour les ajouts sans isomérisation)
+    u = ibu_per_gram(ajouts, volume, boil_gravity, duree_ebullition)
+    return np.divide(np.asarray(ibu_cibles, dtype=np.float64), u, out=np.zeros(np.broadcast(u, np.asarray(ibu_cibles)).shape), where=u > 0)
@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import nullcontext
+
+# ==========================================
+# INSTRUMENTATION DES RUNS (opt-in : BEER_PROFILE=1)
+# ==========================================
+# with stage("css"): ...   mesure le temps réel et la mémoire allouée (tracemalloc) de l'étape.
+# Désactivé, stage() renvoie toujours le même nullcontext : coût d'un appel de fonction, rien d'autre.
+# Les mesures restent dans le processus : fenêtre glissante par étape -> percentiles, totaux cumulés
+# (somme et nombre, jamais décroissants) -> _sum / _count Prometheus ; exportables en lignes JSON.
+# Mémoire : tracemalloc est global au processus (pic remis à zéro à l'entrée d'une étape). Les chiffres
+# ne valent que pour une étape qui n'en a chevauché aucune autre (session unique) ; une étape concurrente
+# (autre session, téléchargement du PDF dans son thread) n'enregistre que son temps, sans mémoire (None),
+# et ne remet pas le pic à zéro sous les pieds d'une autre.
+
+FENETRE = 1000
+_NOOP = nullcontext()
+_actif = os.environ.get("BEER_PROFILE", "") not in ("", "0")
+_jsonl_path = os.environ.get("BEER_PROFILE_JSONL")
+_lock = threading.Lock()
+_mesures = {}          # étape -> deque de (secondes, octets alloués, pic octets)
+_totaux = {}           # étape -> [secondes cumulées, nombre de mesures] depuis le démarrage
+_en_cours = 0          # étapes actives dans le processus
+_epoque = 0            # incrémentée à chaque entrée d'étape : détecte les chevauchements
+_run_courant = threading.local()  # chaque session Streamlit exécute son script dans son propre thread
+
+def enabled(): return _actif
+
+def enable(jsonl_path=None):
+    global _actif, _jsonl_path
+    _actif = True
+    if jsonl_path: _jsonl_path = jsonl_path
+    if not tracemalloc.is_tracing(): tracemalloc.start()
+
+def disable():
+    global _actif
+    _actif = False
+    if tracemalloc.is_tracing(): tracemalloc.stop()
+
+def stage(nom):
+    if not _actif: return _NOOP
+    return _Stage(nom)
+
+class _Stage:
+    __slots__ = ("nom", "t0", "m0", "epoque")
+    def __init__(self, nom): self.nom = nom
+
+    def __enter__(self):
+        global _en_cours, _epoque
+        if not tracemalloc.is_tracing(): tracemalloc.start()
+        with _lock:
+            _en_cours += 1; _epoque += 1
+            # Epoque None : une autre étape tourne déjà, la mémoire de celle-ci ne sera pas mesurable
+            self.epoque = _epoque if _en_cours == 1 else None
+            if self.epoque is not None: tracemalloc.reset_peak()
+            self.m0 = tracemalloc.get_traced_memory()[0]
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        global _en_cours
+        duree = time.perf_counter() - self.t0
+        with _lock:
+            _en_cours -= 1
+            seule = self.epoque == _epoque
+            courant, pic = tracemalloc.get_traced_memory()
+        if seule: record(self.nom, duree, courant - self.m0, pic - self.m0)
+        else: record(self.nom, duree, None, None)
+        return False
+
+def record(nom, secondes, alloue=None, pic=None):
+    # alloue / pic None : mémoire non mesurée (run complet) ou non mesurable (étapes concurrentes)
+    with _lock:
+        file = _mesures.get(nom)
+        if file is None: file = _mesures[nom] = deque(maxlen=FENETRE); _totaux[nom] = [0.0, 0]
+        file.append((secondes, alloue, pic))
+        _totaux[nom][0] += secondes; _totaux[nom][1] += 1
+    etapes = getattr(_run_courant, "etapes", None)
+    if etapes is not None: etapes[nom] = {"ms": secondes * 1e3, "alloue": alloue, "pic": pic}
+
+# --- RUNS ---
+def start_run():
+    if not _actif: return None
+    _run_courant.etapes = {}
+    return time.perf_counter()
+
+def end_run(debut, **contexte):
+    # Enregistre la durée totale du run et, si BEER_PROFILE_JSONL est défini, ajoute une ligne JSON
+    if debut is None or not _actif: return
+    duree = time.perf_counter() - debut
+    record("run", duree)
+    etapes = getattr(_run_courant, "etapes", None) or {}
+    _run_courant.etapes = None
+    if _jsonl_path:
+        ligne = json.dumps({"ts": time.time(), "run_ms": duree * 1e3, "etapes": etapes, **contexte}, ensure_ascii=False)
+        with _lock, open(_jsonl_path, "a", encoding="utf-8") as f: f.write(ligne + "\n")
+
+# --- STATISTIQUES ---
+def _percentile(triees, q):
+    if not triees: return 0.0
+    return triees[min(len(triees) - 1, int(round(q * (len(triees) - 1))))]
+
+def summary():
+    # étape -> n, p50/p90/p99 en ms, allocation moyenne et pic max en octets (fenêtre glissante ; mémoire
+    # sur les seules mesures exclusives, None s'il n'y en a pas), n_total depuis le démarrage
+    with _lock: copie = {nom: list(file) for nom, file in _mesures.items()}; totaux = {nom: t[1] for nom, t in _totaux.items()}
+    res = {}
+    for nom, valeurs in copie.items():
+        durees = sorted(v[0] for v in valeurs)
+        memoire = [v for v in valeurs if v[1] is not None]
+        res[nom] = {
+            "n": len(valeurs), "n_total": totaux[nom], "p50_ms": _percentile(durees, 0.5) * 1e3, "p90_ms": _percentile(durees, 0.9) * 1e3,
+            "p99_ms": _percentile(durees, 0.99) * 1e3, "alloue_moyen": sum(v[1] for v in memoire) / len(memoire) if memoire else None,
+            "pic_max": max(v[2] for v in memoire) if memoire else None
+        }
+    return res
+
+def reset():
+    with _lock: _mesures.clear(); _totaux.clear()
+
+def to_prometheus(prefixe="beer_factory"):
+    lignes = [
+        f"# HELP {prefixe}_stage_seconds Temps réel par étape de run (quantiles sur fenêtre glissante)",
+        f"# TYPE {prefixe}_stage_seconds summary"
+    ]
+    with _lock: copie = {nom: list(file) for nom, file in _mesures.items()}; totaux = {nom: list(t) for nom, t in _totaux.items()}
+    for nom, valeurs in sorted(copie.items()):
+        # Quantiles sur la fenêtre ; _sum / _count cumulés depuis le démarrage (compteurs, pour rate())
+        durees = sorted(v[0] for v in valeurs)
+        for q in (0.5, 0.9, 0.99):
+            lignes.append(f'{prefixe}_stage_seconds{{stage="{nom}",quantile="{q}"}} {_percentile(durees, q):.6g}')
+        lignes.append(f'{prefixe}_stage_seconds_sum{{stage="{nom}"}} {totaux[nom][0]:.9g}')
+        lignes.append(f'{prefixe}_stage_seconds_count{{stage="{nom}"}} {totaux[nom][1]}')
+    lignes += [f"# HELP {prefixe}_stage_peak_bytes Pic mémoire Python max par étape (mesures sans concurrence)", f"# TYPE {prefixe}_stage_peak_bytes gauge"]
+    for nom, valeurs in sorted(copie.items()):
+        pics = [v[2] for v in valeurs if v[2] is not None]
+        if pics: lignes.append(f'{prefixe}_stage_peak_bytes{{stage="{nom}"}} {max(pics)}')
+    return "\n".join(lignes) + "\n"
+
+def to_jsonl():
+    return "".join(json.dumps({"etape": nom, **stats}, ensure_ascii=False) + "\n" for nom, stats in summary().items())
+
+if _actif: enable()
@@ -0,0 +1,216 @@
+import json
+import math
+import os
+
+# ==========================================
+# MOTEUR DE RECETTES (sans Streamlit)
+# ==========================================
+# Importable depuis un backend : aucun appel à st.* ici.
+
+# --- MAPPING EMOJI -> NOM ---
+AROMA_DATA = [
+    ("🍊", "Agrumes"), ("🥭", "Tropical"), ("🌲", "Pin"), ("🍌", "Banane"),
+    ("☕", "Café"), ("🍫", "Chocolat"), ("🍮", "Caramel"), ("🍪", "Biscuit"),
+    ("🥓", "Fumé"), ("🌶️", "Épices"), ("🌸", "Floral")
+]
+AROMA_DICT = {emoji: name for emoji, name in AROMA_DATA}
+
+# --- AMERTUME ---
+IBU_MAP = {"Légère": 15, "Moyenne": 30, "Forte": 50, "Extrême": 80}
+EFFICACITE = 0.75
+
+# --- BASES DE DONNÉES & DESCRIPTIONS ---
+MALTS_DB = {
+    "Pilsner": {"yield": 78, "ebc": 3.5, "desc": "Base légère et croustillante, notes de pain frais."},
+    "Pale Ale": {"yield": 79, "ebc": 6.5, "desc": "Base standard, notes maltées et légèrement biscuitées."},
+    "Maris Otter": {"yield": 78, "ebc": 5.0, "desc": "Malt anglais premium, riche, notes de noisette."},
+    "Munich": {"yield": 76, "ebc": 15, "desc": "Apporte de la rondeur et une couleur dorée profonde."},
+    "Vienna": {"yield": 76, "ebc": 8, "desc": "Légèrement toasté, notes de toffee subtiles."},
+    "Blé (Froment)": {"yield": 80, "ebc": 4, "desc": "Améliore la tenue de mousse et l'onctuosité."},
+    "Carapils": {"yield": 72, "ebc": 3, "desc": "Ajoute du corps et de la mousse sans changer le goût."},
+    "Malt Acide": {"yield": 50, "ebc": 4, "desc": "Utilisé pour abaisser le pH du moût."},
+    "Cara Ruby": {"yield": 74, "ebc": 50, "desc": "Caramel riche, fruits secs et couleur ambrée."},
+    "Crystal 150": {"yield": 70, "ebc": 150, "desc": "Caramel intense, toffee brûlé et couleur rouge."},
+    "Chocolat": {"yield": 65, "ebc": 900, "desc": "Notes de cacao amer et café noir (sans l'astringence)."},
+    "Orge Grillé": {"yield": 65, "ebc": 1200, "desc": "Grains non maltés, goût de café intense et sec."},
+    "Fumé": {"yield": 77, "ebc": 6, "desc": "Séché au bois de hêtre, goût fumé caractéristique."},
+    "Biscuit": {"yield": 75, "ebc": 50, "desc": "Goût de pain grillé et de croûte de pain."}
+}
+
+HOPS_DB = {
+    "Magnum": {"aa": 12.0, "desc": "Amérisant neutre et très propre."},
+    "Saaz": {"aa": 3.5, "desc": "Noble, notes herbacées et épicées douces."},
+    "Citra": {"aa": 13.0, "desc": "Explosion d'agrumes (citron vert, pamplemousse) et fruits tropicaux."},
+    "Amarillo": {"aa": 9.0, "desc": "Orange distincte et notes florales."},
+    "Mosaic": {"aa": 12.0, "desc": "Complexe : myrtille, mandarine, papaye et terreux."},
+    "Galaxy": {"aa": 14.0, "desc": "Passion intense, pêche et agrumes."},
+    "Simcoe": {"aa": 13.0, "desc": "Résineux (Pin), fruit de la passion et abricot."},
+    "Chinook": {"aa": 13.0, "desc": "Pin intense, épicé et pamplemousse."},
+    "Mistral": {"aa": 6.5, "desc": "Douceur florale (rose), melon et litchi."},
+    "Hallertau Mittelfrüh": {"aa": 4.0, "desc": "Noble allemand, floral et légèrement épicé."},
+    "Barbe Rouge": {"aa": 8.0, "desc": "Fruits rouges (fraise, cassis, framboise)."},
+    "Fuggles": {"aa": 4.5, "desc": "Terreux, boisé, classique anglais."},
+    "Cascade": {"aa": 6.0, "desc": "Floral, épicé avec des notes de pamplemousse."},
+    "Tettnanger": {"aa": 4.0, "desc": "Herbacé, floral et légèrement poivré."}
+}
+
+YEAST_DESC = {
+    "US-05 (Neutre)": "Fermentation propre, laisse la place aux houblons.",
+    "Verdant IPA": "Notes d'abricot et de vanille, texture crémeuse.",
+    "S-04": "Sédimentation rapide, esters fruités anglais légers.",
+    "T-58": "Poivrée et épicée, typique des bières belges.",
+    "WB-06": "Banane et girofle, le standard pour Weizen.",
+    "Belle Saison": "Très atténuante, sèche, rustique et poivrée.",
+    "Philly Sour": "Produit de l'acide lactique (acidité) et des notes de pêche.",
+    "W-34/70": "La souche Lager la plus célèbre, neutre et nette."
+}
+
+# --- FONCTIONS MATHÉMATIQUES ---
+def round_grain(poids): return round(poids * 20) / 20
+def calc_og_from_abv(abv): return (abv / 131.25) + 1.010
+def calc_grain_weight(target_sg, volume, efficiency, malt_yield=78):
+    points = (target_sg - 1) * 1000
+    return (points * volume) / (malt_yield * efficiency * 3.83)
+def calc_hops_weight(target_ibu, alpha_acid, time_min, volume_l, boil_gravity):
+    bigness = 1.65 * (0.000125 ** (boil_gravity - 1))
+    boil_fact = (1 - (math.e ** (-0.04 * time_min))) / 4.15
+    utilization = bigness * boil_fact
+    if utilization == 0: return 0
+    return (target_ibu * volume_l) / (utilization * (alpha_acid/100) * 1000)
+def estimate_color(malt_list, volume):
+    mcu = sum([(w * props['ebc']) / volume for w, props in malt_list])
+    return 2.93 * (mcu * 4.23) ** 0.6859
+
+# --- RÈGLES DE STYLE & D'ARÔMES (regles_recettes.json) ---
+# Table déclarative compilée au chargement : pour chaque style, les 2^11 combinaisons d'arômes
+# (masque de bits) sont résolues une fois ; choisir les ingrédients devient une simple indexation.
+# Ajouter un style = ajouter une entrée dans le JSON (la description alimente le menu de l'app).
+REGLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regles_recettes.json")
+CHAMPS_INGREDIENTS = ("malt_base", "malt_spe", "ratio_base", "ratio_spe", "levure", "houblon_amer", "houblon_arome")
+AROMA_BIT = {emoji: 1 << i for i, (emoji, _) in enumerate(AROMA_DATA)}
+_NOM_BIT = {name: 1 << i for i, (_, name) in enumerate(AROMA_DATA)}
+
+def load_rules(chemin=REGLES_PATH):
+    with open(chemin, encoding="utf-8") as f:
+        return json.load(f)
+
+def validate_rules(regles):
+    # Renvoie la liste des erreurs : ingrédients absents des bases, arômes inconnus, ratios incohérents
+    erreurs = []
+    def verifier_ingredients(ou, champs):
+        if "malt_base" in champs and champs["malt_base"] not in MALTS_DB: erreurs.append(f"{ou} : malt inconnu {champs['malt_base']!r}")
+        if "malt_spe" in champs and champs["malt_spe"] not in MALTS_DB: erreurs.append(f"{ou} : malt inconnu {champs['malt_spe']!r}")
+        for cle in ("houblon_amer", "houblon_arome", "houblon"):
+            if cle in champs and champs[cle] not in HOPS_DB: erreurs.append(f"{ou} : houblon inconnu {champs[cle]!r}")
+        if "levure" in champs and champs["levure"] not in YEAST_DESC: erreurs.append(f"{ou} : levure inconnue {champs['levure']!r}")
+    defaut = regles.get("defaut", {})
+    manquants = [c for c in CHAMPS_INGREDIENTS if c not in defaut]
+    if manquants: erreurs.append(f"defaut : champs manquants {manquants}")
+    verifier_ingredients("defaut", defaut)
+    if not regles.get("styles"): erreurs.append("aucun style défini")
+    for style, champs in regles.get("styles", {}).items():
+        verifier_ingredients(f"style {style}", champs)
+        inconnus = set(champs) - set(CHAMPS_INGREDIENTS) - {"description"}
+        if inconnus: erreurs.append(f"style {style} : champs inconnus {sorted(inconnus)}")
+        ratios = dict(defaut, **champs)
+        if abs(ratios.get("ratio_base", 0) + ratios.get("ratio_spe", 0) - 1) > 1e-9: erreurs.append(f"style {style} : ratio_base + ratio_spe != 1")
+    for regle in regles.get("malts_aromes", []) + regles.get("houblon_arome_priorite", []):
+        if regle.get("arome") not in _NOM_BIT: erreurs.append(f"arôme inconnu {regle.get('arome')!r} (absent de AROMA_DATA)")
+        verifier_ingredients(f"arôme {regle.get('arome')}", regle)
+        for style in regle.get("sauf_styles", []):
+            if style not in regles.get("styles", {}): erreurs.append(f"arôme {regle.get('arome')} : style inconnu {style!r}")
+    # Substitutions (planification de production) : ingrédient -> remplaçants équivalents, tous dans les bases
+    for famille, base in (("houblons", HOPS_DB), ("malts", MALTS_DB)):
+        for nom, remplacants in regles.get("substitutions", {}).get(famille, {}).items():
+            for n in [nom] + remplacants:
+                if n not in base: erreurs.append(f"substitutions {famille} : ingrédient inconnu {n!r}")
+    return erreurs
+
+def compile_rules(regles):
+    erreurs = validate_rules(regles)
+    if erreurs: raise ValueError("Règles de recettes invalides :\n- " + "\n- ".join(erreurs))
+    malts_aromes = [(_NOM_BIT[r["arome"]], r) for r in regles.get("malts_aromes", [])]
+    houblons = [(_NOM_BIT[r["arome"]], r["houblon"]) for r in regles.get("houblon_arome_priorite", [])]
+    table = {}
+    # Clé None : style inconnu, ingrédients par défaut (comme l'ancienne chaîne if/elif)
+    for style, champs in list(regles["styles"].items()) + [(None, {})]:
+        base = {c: champs.get(c, regles["defaut"][c]) for c in CHAMPS_INGREDIENTS}
+        par_masque = []
+        for masque in range(1 << len(AROMA_DATA)):
+            ing = dict(base)
+            # Règles de malts appliquées dans l'ordre du fichier (la dernière qui s'applique gagne)
+            for bit, regle in malts_aromes:
+                if masque & bit and style not in regle.get("sauf_styles", ()):
+                    for c in ("malt_base", "malt_spe"):
+                        if c in regle: ing[c] = regle[c]
+            # Houblon aromatique : premier arôme présent dans l'ordre de priorité
+            for bit, houblon in houblons:
+                if masque & bit: ing["houblon_arome"] = houblon; break
+            par_masque.append(ing)
+        table[style] = par_masque
+    return table
+
+_REGLES = load_rules()
+STYLES_DEF = {style: champs.get("description", "") for style, champs in _REGLES["styles"].items()}
+SUBSTITUTS = {famille: _REGLES.get("substitutions", {}).get(famille, {}) for famille in ("houblons", "malts")}
+_REGLES_COMPILEES = compile_rules(_REGLES)
+
+def aroma_mask(aromes):
+    masque = 0
+    for e in aromes: masque |= AROMA_BIT[e]
+    return masque
+
+# --- CHOIX DES INGRÉDIENTS ---
+def resolve_ingredients(style, aromes):
+    # aromes : liste d'emojis (l'ordre de sélection n'a pas d'influence).
+    # Le dict renvoyé est partagé par la table compilée : ne pas le modifier.
+    par_masque = _REGLES_COMPILEES.get(style) or _REGLES_COMPILEES[None]
+    return par_masque[aroma_mask(aromes)]
+
+# --- GÉNÉRATION ---
+def generate_recipe(style, volume, abv, bitterness, aromas):
+    # bitterness : libellé du curseur ("Légère", ...) ; aromas : liste d'emojis
+    return _build_recipe(style, volume, abv, IBU_MAP[bitterness], list(aromas), resolve_ingredients(style, aromas))
+
+def generate_recipes(batch):
+    # batch : itérable de tuples (style, volume, abv, bitterness, aromas) ou de dicts avec ces clés
+    # La résolution des ingrédients ne dépend que de (style, ensemble d'arômes) : on la calcule une fois par couple.
+    ingredients = {}
+    recettes = []
+    for params in batch:
+        if isinstance(params, dict):
+            style, volume, abv, bitterness, aromas = (params["style"], params["volume"], params["abv"], params["bitterness"], params["aromas"])
+        else:
+            style, volume, abv, bitterness, aromas = params
+        cle = (style, frozenset(aromas))
+        ing = ingredients.get(cle)
+        if ing is None:
+            ing = ingredients[cle] = resolve_ingredients(style, aromas)
+        recettes.append(_build_recipe(style, volume, abv, IBU_MAP[bitterness], list(aromas), ing))
+    return recettes
+
+def _build_recipe(style, volume, degre_vise, ibu_target, aromes, ing):
+    efficacite = EFFICACITE
+    malt_base_nom = ing["malt_base"]; malt_spe_nom = ing["malt_spe"]; ratio_base = ing["ratio_base"]; ratio_spe = ing["ratio_spe"]
+    houblon_amer = ing["houblon_amer"]; houblon_arome = ing["houblon_arome"]
+
+    target_og = calc_og_from_abv(degre_vise)
+    avg_yield = (MALTS_DB.get(malt_base_nom, {"yield":78})['yield'] * ratio_base) + (MALTS_DB.get(malt_spe_nom, {"yield":75})['yield'] * ratio_spe)
+    total_grain_mass = calc_grain_weight(target_og, volume, efficacite, avg_yield)
+    poids_base = round_grain(total_grain_mass * ratio_base); poids_spe = round_grain(total_grain_mass * ratio_spe)
+    total_grain_affiche = poids_base + poids_spe
+    ebc_estime = estimate_color([(poids_base, MALTS_DB.get(malt_base_nom, {'ebc':4})), (poids_spe, MALTS_DB.get(malt_spe_nom, {'ebc':4}))], volume)
+    boil_gravity = target_og * 0.85
+    aa_amer = HOPS_DB.get(houblon_amer, {'aa':10})['aa']; aa_arome = HOPS_DB.get(houblon_arome, {'aa':5})['aa']
+    grammes_amer = calc_hops_weight(ibu_target * 0.8, aa_amer, 60, volume, boil_gravity)
+    grammes_arome = calc_hops_weight(ibu_target * 0.2, aa_arome, 5, volume, boil_gravity)
+    eau_empatage = total_grain_affiche * 3.0; eau_rincage = (volume * 1.15 + total_grain_affiche) - eau_empatage
+    if eau_rincage < 0: eau_rincage = 0
+
+    return {
+        "style": style, "aromes": aromes, "volume": volume, "abv": degre_vise,
+        "og": target_og, "ibu": ibu_target, "ebc": ebc_estime, "eff": efficacite,
+        "grains": [{"nom": malt_base_nom, "poids": poids_base, "ratio": ratio_base}, {"nom": malt_spe_nom, "poids": poids_spe, "ratio": ratio_spe}],
+        "houblons": [{"nom": houblon_amer, "poids": int(grammes_amer), "usage": "Ebu 60min", "aa": aa_amer}, {"nom": houblon_arome, "poids": int(grammes_arome), "usage": "Arome 5min", "aa": aa_arome}],
+        "eau_emp": eau_empatage, "eau_rinc": eau_rincage, "levure": ing["levure"]
+    }
@@ -0,0 +1,89 @@
+import functools
+import os
+from fpdf import FPDF
+from moteur_biere import AROMA_DICT
+from assets_biere import variant_path
+
+# --- PDF GENERATOR ---
+class PDF(FPDF):
+    def header(self):
+        # Logo réduit (~27 Ko) au lieu du PNG d'origine de 2,2 Mo
+        logo = variant_path("logo_pdf")
+        if os.path.exists(logo):
+            # Image décodée une fois par processus ; FPDF ne l'intègre qu'une fois par document, même sur N pages
+            if logo not in self.images: self.images[logo] = dict(_image_info(logo), i=len(self.images) + 1)
+            self.image(logo, 10, 8, 25)
+        self.set_font('Arial', 'B', 20)
+        self.cell(0, 15, 'BEER FACTORY', 0, 1, 'C')
+        self.ln(5)
+
+@functools.lru_cache(maxsize=4)
+def _image_info(chemin):
+    # Copie par document (dict(...)) : FPDF y inscrit le numéro d'objet lors de l'écriture
+    if chemin.lower().endswith((".jpg", ".jpeg")): return FPDF()._parsejpg(chemin)
+    return FPDF()._parsepng(chemin)
+
+def create_pdf_compact(data):
+    pdf = PDF(); pdf.add_page()
+    # FORCE LE PDF SUR UNE SEULE PAGE (Désactive le saut auto)
+    pdf.set_auto_page_break(auto=False, margin=0) 
+    _write_recipe(pdf, data)
+    pdf.set_y(-15); pdf.set_font("Arial", 'I', 8); pdf.cell(0, 10, "Systeme Beer Factory", 0, 0, 'C')
+    return pdf.output(dest='S').encode('latin-1')
+
+def _write_recipe(pdf, data):
+    pdf.set_font("Arial", 'B', 14); pdf.cell(0, 8, f"Fiche de Production : {data['style'].upper()}", ln=True, align='C')
+    pdf.set_font("Arial", 'I', 11)
+    aromes_noms = [AROMA_DICT.get(e, "") for e in data['aromes']]
+    aromes_txt = ", ".join(aromes_noms).encode('latin-1', 'replace').decode('latin-1')
+    pdf.cell(0, 6, f"Profil : {aromes_txt}", ln=True, align='C'); pdf.ln(5)
+    pdf.set_fill_color(230, 230, 230); pdf.set_font("Arial", 'B', 10)
+    info_str = f"Vol: {data['volume']}L | ABV: {data['abv']}% | OG: {data['og']:.3f} | IBU: {int(data['ibu'])} | EBC: {int(data['ebc'])} | Eff: {int(data['eff']*100)}%"
+    pdf.cell(0, 10, info_str, 1, 1, 'C', fill=True); pdf.ln(8)
+    pdf.set_font("Arial", 'B', 12); pdf.cell(0, 8, "1. Grains & Fermentescibles", ln=True); pdf.set_font("Arial", '', 10)
+    h_line = 7; pdf.set_fill_color(245, 245, 245)
+    pdf.cell(25, h_line, "Poids", 1, 0, 'C', True); pdf.cell(140, h_line, "Malt", 1, 0, 'L', True); pdf.cell(25, h_line, "%", 1, 1, 'C', True)
+    total_grain = 0
+    for grain in data['grains']:
+        pdf.cell(25, h_line, f"{grain['poids']} kg", 1, 0, 'C'); nom_grain = grain['nom'].encode('latin-1', 'replace').decode('latin-1')
+        pdf.cell(140, h_line, f" {nom_grain}", 1, 0, 'L'); pdf.cell(25, h_line, f"{grain['ratio']*100:.0f} %", 1, 1, 'C'); total_grain += grain['poids']
+    pdf.set_font("Arial", 'B', 10); pdf.cell(165, h_line, f"Total : {total_grain:.2f} kg", 0, 1, 'R'); pdf.ln(8)
+    pdf.set_font("Arial", 'B', 12); pdf.cell(0, 8, "2. Houblonnage", ln=True); pdf.set_font("Arial", '', 10)
+    pdf.cell(25, h_line, "Poids", 1, 0, 'C', True); pdf.cell(60, h_line, "Variete", 1, 0, 'L', True); pdf.cell(60, h_line, "Usage", 1, 0, 'L', True); pdf.cell(45, h_line, "AA%", 1, 1, 'C', True)
+    for hop in data['houblons']:
+        pdf.cell(25, h_line, f"{hop['poids']} g", 1, 0, 'C'); pdf.cell(60, h_line, f" {hop['nom']}", 1, 0, 'L'); pdf.cell(60, h_line, f" {hop['usage']}", 1, 0, 'L'); pdf.cell(45, h_line, f"{hop['aa']} %", 1, 1, 'C')
+    pdf.ln(8)
+    pdf.set_font("Arial", 'B', 12); pdf.cell(0, 8, "3. Processus", ln=True); pdf.set_font("Arial", '', 10)
+    pdf.cell(95, 8, f"Empatage: {data['eau_emp']:.1f} L (67 C - 60min)", 1); pdf.cell(95, 8, f"Rincage: {data['eau_rinc']:.1f} L (75 C)", 1, 1)
+    pdf.cell(95, 8, f"Ebullition: 60 min (100 C)", 1); pdf.cell(95, 8, f"Fermentation: ~15 jours (20 C)", 1, 1); pdf.ln(8)
+    pdf.set_font("Arial", 'B', 10); pdf.cell(0, 8, f"Levure : {data['levure']}", 0, 1, 'L')
+
+# --- LIVRET MULTI-RECETTES ---
+class PDFLivret(PDF):
+    def footer(self):
+        self.set_y(-15); self.set_font("Arial", 'I', 8); self.cell(0, 10, f"Systeme Beer Factory - page {self.page_no()}", 0, 0, 'C')
+
+def create_pdf_booklet(recettes):
+    # Une recette par page (suite sur la page suivante si besoin : saut auto actif), logo intégré une seule fois
+    pdf = PDFLivret()
+    pdf.set_auto_page_break(auto=True, margin=20)
+    for data in recettes:
+        pdf.add_page(); _write_recipe(pdf, data)
+    return pdf.output(dest='S').encode('latin-1')
+
+def write_booklets(recettes, prefixe, par_fichier=200):
+    # FPDF garde toutes les pages d'un document en mémoire : pour une mémoire bornée quel que soit
+    # le nombre de recettes, l'itérable est consommé par lots de par_fichier et chaque lot est écrit
+    # dans son propre fichier <prefixe>_001.pdf, <prefixe>_002.pdf, ...
+    chemins = []; lot = []
+    for data in recettes:
+        lot.append(data)
+        if len(lot) == par_fichier:
+            chemins.append(_write_volume(lot, prefixe, len(chemins) + 1)); lot = []
+    if lot or not chemins: chemins.append(_write_volume(lot, prefixe, len(chemins) + 1))
+    return chemins
+
+def _write_volume(lot, prefixe, numero):
+    chemin = f"{prefixe}_{numero:03d}.pdf"
+    with open(chemin, "wb") as f: f.write(create_pdf_booklet(lot))
+    return chemin
@@ -0,0 +1,113 @@
+import numpy as np
+
+from moteur_biere import MALTS_DB, HOPS_DB, SUBSTITUTS, round_grain, estimate_color, generate_recipes
+
+# ==========================================
+# PLANIFICATION DE PRODUCTION SOUS CONTRAINTE DE STOCK
+# ==========================================
+# inventaire : {nom: quantité} — malts en kg, houblons en g (unités de recette_data) ; absent = 0.
+#              Les levures ne sont pas suivies.
+# demandes   : même format que generate_recipes (tuples ou dicts), un dict peut porter "priorite" (défaut 1).
+#
+# Maximiser le nombre de brassins est un sac à dos multidimensionnel : heuristique gloutonne classique.
+#   1. matrice des besoins (demandes x ingrédients) et tension de chaque ingrédient = demande totale / stock ;
+#   2. efficacité d'une demande = priorité / Σ besoin x tension / stock  -> les brassins sobres en
+#      ingrédients rares passent d'abord ;
+#   3. premier passage sans substitution, puis repasse des refusés avec substitutions (regles_recettes.json) :
+#      houblon remplacé à IBU constant (grammes x aa d'origine / aa du remplaçant),
+#      malt remplacé à densité constante (kg x rendement d'origine / rendement du remplaçant).
+
+TOLERANCE = 1e-9
+
+def recipe_needs(recette):
+    # {nom: quantité} consommée par une recette (kg de malt, g de houblon)
+    besoins = {}
+    for grain in recette["grains"]: besoins[grain["nom"]] = besoins.get(grain["nom"], 0) + grain["poids"]
+    for hop in recette["houblons"]: besoins[hop["nom"]] = besoins.get(hop["nom"], 0) + hop["poids"]
+    return besoins
+
+def plan_production(inventaire, demandes, substitutions=True, tri=True):
+    # -> {"lots", "refusees", "stock_restant", "achats", "stats"} ; tri=False : ordre d'arrivée (référence)
+    demandes = list(demandes)
+    priorites = np.array([d.get("priorite", 1) if isinstance(d, dict) else 1 for d in demandes], dtype=np.float64)
+    recettes = generate_recipes(demandes)
+
+    noms = list(MALTS_DB) + list(HOPS_DB)
+    noms += sorted(({n for r in recettes for n in recipe_needs(r)} | set(inventaire)) - set(noms))
+    col = {n: j for j, n in enumerate(noms)}
+    D = np.zeros((len(recettes), len(noms)))
+    for i, r in enumerate(recettes):
+        for n, q in recipe_needs(r).items(): D[i, col[n]] += q
+    stock = np.array([float(inventaire.get(n, 0)) for n in noms])
+
+    if tri:
+        stock_sur = np.maximum(stock, TOLERANCE)
+        tension = D.sum(0) / stock_sur
+        ordre = np.argsort(-priorites / np.maximum(D @ (tension / stock_sur), TOLERANCE), kind="stable")
+    else:
+        ordre = np.arange(len(recettes))
+
+    restant = stock.copy()
+    acceptees = {}; refusees = []
+    for i in ordre:
+        if (D[i] <= restant + TOLERANCE).all():
+            restant -= D[i]; acceptees[i] = (recettes[i], [])
+        else:
+            refusees.append(i)
+    if substitutions:
+        encore = []
+        for i in refusees:
+            essai = _substitute(recettes[i], D[i], restant, noms, col)
+            if essai is None: encore.append(i); continue
+            besoin, recette, subs = essai
+            restant -= besoin; acceptees[i] = (recette, subs)
+        refusees = encore
+
+    # Manques par demande refusée (au stock final) et achats nécessaires pour toutes les brasser
+    lignes_refusees = []
+    for i in sorted(refusees):
+        manque = np.maximum(D[i] - restant, 0)
+        lignes_refusees.append({"demande": int(i), "recette": recettes[i], "manques": {noms[j]: float(manque[j]) for j in np.flatnonzero(manque > TOLERANCE)}})
+    achats = np.maximum(D[refusees].sum(0) - restant, 0) if refusees else np.zeros(len(noms))
+    lots = [{"demande": int(i), "recette": acceptees[i][0], "substitutions": acceptees[i][1]} for i in sorted(acceptees)]
+    return {
+        "lots": lots, "refusees": lignes_refusees,
+        "stock_restant": {noms[j]: float(restant[j]) for j in np.flatnonzero(restant > TOLERANCE)},
+        "achats": {noms[j]: float(achats[j]) for j in np.flatnonzero(achats > TOLERANCE)},
+        "stats": {
+            "demandes": len(recettes), "planifiees": len(lots), "refusees": len(lignes_refusees),
+            "avec_substitution": sum(1 for lot in lots if lot["substitutions"])
+        }
+    }
+
+def _substitute(recette, besoin, restant, noms, col):
+    # Remplace chaque ingrédient en rupture par le premier équivalent disponible ; None si impossible
+    besoin = besoin.copy(); subs = []
+    grains = [dict(g) for g in recette["grains"]]; houblons = [dict(h) for h in recette["houblons"]]
+    for j in np.flatnonzero(besoin > restant + TOLERANCE):
+        nom = noms[j]
+        est_houblon = nom in HOPS_DB
+        lignes = houblons if est_houblon else grains
+        for remplacant in SUBSTITUTS["houblons" if est_houblon else "malts"].get(nom, []):
+            k = col[remplacant]
+            if est_houblon: quantites = [round(l["poids"] * HOPS_DB[nom]["aa"] / HOPS_DB[remplacant]["aa"]) for l in lignes if l["nom"] == nom]
+            else: quantites = [round_grain(l["poids"] * MALTS_DB[nom]["yield"] / MALTS_DB[remplacant]["yield"]) for l in lignes if l["nom"] == nom]
+            if besoin[k] + sum(quantites) > restant[k] + TOLERANCE: continue
+            besoin[k] += sum(quantites); besoin[j] = 0
+            for l, q in zip([l for l in lignes if l["nom"] == nom], quantites):
+                l["nom"] = remplacant; l["poids"] = q
+                if est_houblon: l["aa"] = HOPS_DB[remplacant]["aa"]
+            subs.append({"origine": nom, "remplacant": remplacant, "quantite": sum(quantites)})
+            break
+        else:
+            return None
+    if not (besoin <= restant + TOLERANCE).all(): return None
+    recette = dict(recette, grains=grains, houblons=houblons)
+    # Malt remplacé : la densité et l'IBU sont conservés, mais la masse de grain change -> EBC, ratios et
+    # volumes d'eau recalculés comme dans _build_recipe (moteur_biere)
+    if any(s["origine"] in MALTS_DB for s in subs):
+        recette["ebc"] = estimate_color([(g["poids"], MALTS_DB[g["nom"]]) for g in grains], recette["volume"])
+        total_grain = sum(g["poids"] for g in grains)
+        for g in grains: g["ratio"] = round(g["poids"] / total_grain, 2) if total_grain else 0
+        recette["eau_emp"] = total_grain * 3.0; recette["eau_rinc"] = max((recette["volume"] * 1.15 + total_grain) - recette["eau_emp"], 0)
+    return besoin, recette, subs
@@ -0,0 +1,158 @@
+import numpy as np
+
+from moteur_biere import AROMA_DATA, STYLES_DEF, generate_recipe
+from catalogue_bieres import load_catalog, normalize_keyword
+
+# ==========================================
+# RECHERCHE "BIÈRES COMME MA RECETTE" (plus proches voisins)
+# ==========================================
+# Chaque bière du catalogue et chaque recette générée devient un vecteur :
+#   [ arômes AROMA_DATA (one-hot) | style (one-hot) | ABV | EBC ]
+# La distance est euclidienne sur ces vecteurs pondérés (float32).
+# Deux index :
+#   - BruteForceIndex  : produit matriciel par blocs, exact ; idéal jusqu'à quelques dizaines de milliers de lignes
+#   - PartitionedIndex : type IVF (k-means grossier + nprobe partitions visitées) pour les grands catalogues
+
+AROMES = [nom for _, nom in AROMA_DATA]
+_AROME_COL = {normalize_keyword(nom): j for j, nom in enumerate(AROMES)}
+_EMOJI_NOM = {e: nom for e, nom in AROMA_DATA}
+STYLES = list(STYLES_DEF.keys())
+_STYLE_COL = {s: len(AROMES) + j for j, s in enumerate(STYLES)}
+COL_ABV = len(AROMES) + len(STYLES)
+COL_EBC = COL_ABV + 1
+DIMENSION = COL_EBC + 1
+
+# Poids : 1 arôme commun ~ 1 point de style ~ 2 % d'ABV ~ un facteur e^1.5 d'EBC
+POIDS_AROME = 1.0
+POIDS_STYLE = 1.0
+POIDS_ABV = 0.5
+POIDS_EBC = 1.0 / 1.5
+
+BRUTE_FORCE_MAX = 50_000
+
+# --- ENCODAGE ---
+def encode(aromes, abv, style, ebc):
+    # aromes : noms (ex. "Agrumes") ; les mots hors AROMA_DATA sont ignorés
+    v = np.zeros(DIMENSION, dtype=np.float32)
+    for mot in aromes:
+        j = _AROME_COL.get(normalize_keyword(mot))
+        if j is not None: v[j] = POIDS_AROME
+    if style in _STYLE_COL: v[_STYLE_COL[style]] = POIDS_STYLE
+    v[COL_ABV] = abv * POIDS_ABV
+    v[COL_EBC] = np.log(max(ebc, 1.0)) * POIDS_EBC
+    return v
+
+def encode_recipe(recette_data):
+    aromes = [_EMOJI_NOM.get(e, e) for e in recette_data["aromes"]]
+    return encode(aromes, recette_data["abv"], recette_data["style"], recette_data["ebc"])
+
+_EBC_CACHE = {}
+def estimated_ebc(style, abv, aromes):
+    # EBC d'une bière du commerce : celui de la recette que le générateur produirait pour son style,
+    # son degré et ses arômes reconnus (20 L, amertume moyenne) ; mémorisé par combinaison distincte.
+    emojis = tuple(sorted(e for e, nom in AROMA_DATA if normalize_keyword(nom) in {normalize_keyword(a) for a in aromes}))
+    cle = (style if style in STYLES_DEF else "Blonde", round(abv, 1), emojis)
+    ebc = _EBC_CACHE.get(cle)
+    if ebc is None:
+        ebc = _EBC_CACHE[cle] = generate_recipe(cle[0], 20, cle[1], "Moyenne", list(emojis))["ebc"]
+    return ebc
+
+def encode_catalog(cat):
+    X = np.zeros((len(cat), DIMENSION), dtype=np.float32)
+    for i in range(len(cat)):
+        aromes = [cat.mots[c] for c in cat.aromes_codes(i)]
+        style = cat.type_of(i); abv = float(cat.degres[i])
+        X[i] = encode(aromes, abv, style, estimated_ebc(style, abv, aromes))
+    return X
+
+# --- INDEX ---
+class BruteForceIndex:
+    def __init__(self, X, bloc=65_536):
+        self.X = np.ascontiguousarray(X, dtype=np.float32)
+        self.normes = np.einsum("ij,ij->i", self.X, self.X)
+        self.bloc = bloc
+
+    def __len__(self): return len(self.X)
+
+    def search(self, Q, k=5, bloc_requetes=4096):
+        # Q : (m, d) ; renvoie (distances², indices) de forme (m, k), triés.
+        # Requêtes et lignes sont traitées par blocs : la matrice des distances reste bornée à bloc_requetes x bloc.
+        Q = np.atleast_2d(np.asarray(Q, dtype=np.float32))
+        k = min(k, len(self.X))
+        res = [self._search_block(Q[i:i + bloc_requetes], k) for i in range(0, len(Q), bloc_requetes)]
+        return np.concatenate([d for d, _ in res]), np.concatenate([i for _, i in res])
+
+    def _search_block(self, Q, k):
+        q_normes = np.einsum("ij,ij->i", Q, Q)[:, None]
+        best_d = np.full((len(Q), 0), np.inf, dtype=np.float32); best_i = np.empty((len(Q), 0), dtype=np.int64)
+        for debut in range(0, len(self.X), self.bloc):
+            Xb = self.X[debut:debut + self.bloc]
+            d = q_normes - 2 * Q @ Xb.T + self.normes[debut:debut + self.bloc]
+            kb = min(k, d.shape[1])
+            part = np.argpartition(d, kb - 1, axis=1)[:, :kb]
+            best_d = np.concatenate([best_d, np.take_along_axis(d, part, axis=1)], axis=1)
+            best_i = np.concatenate([best_i, part + debut], axis=1)
+            if best_d.shape[1] > k:
+                garde = np.argpartition(best_d, k - 1, axis=1)[:, :k]
+                best_d = np.take_along_axis(best_d, garde, axis=1); best_i = np.take_along_axis(best_i, garde, axis=1)
+        ordre = np.argsort(best_d, axis=1)
+        return np.maximum(np.take_along_axis(best_d, ordre, axis=1), 0), np.take_along_axis(best_i, ordre, axis=1)
+
+class PartitionedIndex:
+    def __init__(self, X, n_partitions=None, nprobe=8, iterations=10, points_par_partition=64, seed=0):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_partitions = n_partitions or max(1, int(np.sqrt(len(X))))
+        self.nprobe = min(nprobe, n_partitions)
+        rng = np.random.default_rng(seed)
+        # k-means sur un échantillon proportionnel au nombre de partitions, pas à la taille du catalogue
+        ech = X[rng.choice(len(X), min(len(X), points_par_partition * n_partitions), replace=False)]
+        centres = ech[rng.choice(len(ech), n_partitions, replace=False)].copy()
+        for _ in range(iterations):
+            _, affect = BruteForceIndex(centres).search(ech, 1)
+            affect = affect[:, 0]
+            sommes = np.zeros_like(centres); np.add.at(sommes, affect, ech)
+            effectifs = np.bincount(affect, minlength=n_partitions)
+            non_vides = effectifs > 0
+            centres[non_vides] = sommes[non_vides] / effectifs[non_vides, None]
+        self.centres = BruteForceIndex(centres)
+        _, affect = self.centres.search(X, 1)
+        affect = affect[:, 0]
+        # Lignes regroupées par partition (contiguës) + offsets
+        self.ordre = np.argsort(affect, kind="stable")
+        self.X = X[self.ordre]
+        self.normes = np.einsum("ij,ij->i", self.X, self.X)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(affect, minlength=n_partitions))])
+
+    def __len__(self): return len(self.X)
+
+    def search(self, Q, k=5):
+        Q = np.atleast_2d(np.asarray(Q, dtype=np.float32))
+        _, parts = self.centres.search(Q, self.nprobe)
+        D = np.full((len(Q), k), np.inf, dtype=np.float32); I = np.full((len(Q), k), -1, dtype=np.int64)
+        for m, q in enumerate(Q):
+            # Partitions contiguës : les lignes candidates sont des tranches, concaténées en une fois
+            lignes = np.concatenate([np.arange(self.offsets[p], self.offsets[p + 1]) for p in parts[m]])
+            d = float(q @ q) - 2 * self.X[lignes] @ q + self.normes[lignes]
+            kb = min(k, len(lignes))
+            if kb == 0: continue
+            sel = np.argpartition(d, kb - 1)[:kb]
+            sel = sel[np.argsort(d[sel])]
+            D[m, :kb] = np.maximum(d[sel], 0); I[m, :kb] = self.ordre[lignes[sel]]
+        return D, I
+
+def build_index(X, **options):
+    return BruteForceIndex(X) if len(X) <= BRUTE_FORCE_MAX else PartitionedIndex(X, **options)
+
+# --- RECHERCHE DANS LE CATALOGUE ---
+class BeerSearch:
+    def __init__(self, cat=None):
+        self.cat = cat if cat is not None else load_catalog()
+        self.index = build_index(encode_catalog(self.cat))
+
+    def query(self, recettes, k=3):
+        # recettes : un recette_data ou une liste ; renvoie une liste (ou une liste de listes) de bières
+        seule = isinstance(recettes, dict)
+        lot = [recettes] if seule else list(recettes)
+        D, I = self.index.search(np.stack([encode_recipe(r) for r in lot]), k)
+        res = [[dict(self.cat.beer(int(i)), distance=float(np.sqrt(d))) for d, i in zip(ligne_d, ligne_i) if i >= 0] for ligne_d, ligne_i in zip(D, I)]
+        return res[0] if seule else res
@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from moteur_biere import AROMA_DATA, AROMA_DICT, STYLES_DEF, IBU_MAP, generate_recipe
+from table_recettes import RecipeTable
+from cache_recettes import RecipeCache
+from cache_pdf import PdfCache, recipe_key
+
+# ==========================================
+# SERVICE HTTP SANS INTERFACE (recettes JSON + PDF)
+# ==========================================
+# POST /recette      {"style", "volume", "abv", "amertume", "aromes"} -> recette_data (JSON)
+# POST /recette/pdf  même corps -> fiche PDF (create_pdf_compact)
+# GET  /options      valeurs acceptées ; GET /sante ; GET /stats
+#
+# Les recettes sont calculées directement sur la boucle asyncio (table mmap ou moteur : quelques µs).
+# Les PDF (FPDF, CPU) partent dans un pool de processus borné : les demandes sont regroupées
+# en lots (MAX_LOT ou DELAI_LOT), les doublons en cours partagent le même rendu, et au-delà de
+# MAX_ATTENTE PDF en attente le service répond 503 + Retry-After au lieu d'empiler.
+#
+# python service_biere.py --port 8000 --workers 4
+
+MAX_LOT = 16
+DELAI_LOT = 0.005      # secondes d'attente max pour compléter un lot
+MAX_ATTENTE = 256      # PDF en file + en cours de rendu
+
+class ErreurRequete(ValueError): pass
+class ServiceSature(RuntimeError): pass
+
+# --- VALIDATION ---
+EMOJI_PAR_NOM = {nom.lower(): emoji for emoji, nom in AROMA_DATA}
+
+def _nombre(valeur, nom):
+    # Nombre JSON uniquement (pas de booléen ni de chaîne)
+    if isinstance(valeur, bool) or not isinstance(valeur, (int, float)): raise ErreurRequete(f"{nom} doit être un nombre")
+    return valeur
+
+def parse_request(corps):
+    # Même domaine que l'interface, valeurs de curseur exactes (aucun arrondi silencieux) :
+    # styles / amertumes connus, volume 10-100 L par pas de 10, abv 3-12 % au dixième, 2 arômes max
+    if not isinstance(corps, dict): raise ErreurRequete("corps JSON attendu : un objet")
+    style = corps.get("style", "Blonde"); amertume = corps.get("amertume", "Moyenne")
+    if not isinstance(style, str) or style not in STYLES_DEF: raise ErreurRequete(f"style inconnu : {style!r}")
+    if not isinstance(amertume, str) or amertume not in IBU_MAP: raise ErreurRequete(f"amertume inconnue : {amertume!r}")
+    volume = _nombre(corps.get("volume", 20), "volume"); abv = _nombre(corps.get("abv", 6.0), "abv")
+    if not 10 <= volume <= 100: raise ErreurRequete("volume hors limites (10-100 L)")
+    if volume % 10: raise ErreurRequete(f"volume {volume!r} hors grille (pas de 10 L)")
+    if not 3.0 <= abv <= 12.0: raise ErreurRequete("abv hors limites (3-12 %)")
+    if abs(abv * 10 - round(abv * 10)) > 1e-9: raise ErreurRequete(f"abv {abv!r} hors grille (pas de 0,1 %)")
+    volume = int(volume); abv = round(float(abv), 1)
+    liste = corps.get("aromes", [])
+    if liste is None: liste = []
+    if not isinstance(liste, list): raise ErreurRequete("aromes doit être une liste")
+    aromes = []
+    for a in liste:
+        # Emoji ou nom ("Agrumes" / "🍊")
+        if not isinstance(a, str): raise ErreurRequete(f"arôme invalide : {a!r} (chaîne attendue)")
+        emoji = a if a in AROMA_DICT else EMOJI_PAR_NOM.get(a.lower())
+        if emoji is None: raise ErreurRequete(f"arôme inconnu : {a!r}")
+        if emoji not in aromes: aromes.append(emoji)
+    if len(aromes) > 2: raise ErreurRequete("2 arômes maximum")
+    return style, volume, abv, amertume, aromes
+
+# --- RECETTES (boucle asyncio) ---
+class RecipeService:
+    def __init__(self, table=None, cache=None):
+        self.table = table; self.cache = cache or RecipeCache()
+        self._empreinte_table = self.cache.empreinte
+
+    def compute(self, style, volume, abv, amertume, aromes):
+        def calculer():
+            # Bases modifiées depuis l'ouverture (cache invalidé) : la table est périmée, calcul direct
+            if self.cache.empreinte != self._empreinte_table: self.table = None
+            recette = self.table.lookup(style, volume, abv, amertume, aromes) if self.table else None
+            return recette if recette is not None else generate_recipe(style, volume, abv, amertume, aromes)
+        return self.cache.get_or_compute(style, volume, abv, amertume, aromes, calculer)
+
+# --- PDF (pool de processus) ---
+def _init_worker():
+    # Préchauffage : import de FPDF et décodage du logo une fois par processus
+    from pdf_biere import create_pdf_compact
+    create_pdf_compact(generate_recipe("Blonde", 20, 6.0, "Moyenne", []))
+
+def _render_lot(recettes):
+    from pdf_biere import create_pdf_compact
+    return [create_pdf_compact(r) for r in recettes]
+
+class PdfRenderer:
+    def __init__(self, workers=None, max_lot=MAX_LOT, delai_lot=DELAI_LOT, max_attente=MAX_ATTENTE, cache=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_lot = max_lot; self.delai_lot = delai_lot; self.max_attente = max_attente
+        self.cache = cache or PdfCache(max_entries=512)
+        self._en_cours = {}    # clé recette -> future partagée (doublons simultanés)
+        self._attente = 0
+        self.lots = 0; self.rendus = 0; self.rejets = 0
+
+    async def start(self):
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker)
+        self._file = asyncio.Queue()
+        # Au plus deux lots par worker en vol : le suivant se remplit pendant que le précédent est rendu
+        self._slots = asyncio.Semaphore(2 * self.workers)
+        self._boucle = asyncio.create_task(self._regroupe())
+
+    async def stop(self):
+        self._boucle.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def render(self, recette):
+        cle = recipe_key(recette)
+        pdf_bytes = self.cache.get(cle)
+        if pdf_bytes is not None: return pdf_bytes
+        futur = self._en_cours.get(cle)
+        if futur is None:
+            if self._attente >= self.max_attente:
+                self.rejets += 1
+                raise ServiceSature(f"{self._attente} PDF en attente")
+            futur = self._en_cours[cle] = asyncio.get_running_loop().create_future()
+            self._attente += 1
+            self._file.put_nowait((cle, recette, futur))
+        return await asyncio.shield(futur)
+
+    def stats(self):
+        return {
+            "workers": self.workers, "en_attente": self._attente, "max_attente": self.max_attente,
+            "lots": self.lots, "rendus": self.rendus, "rejets": self.rejets,
+            "taille_moyenne_lot": self.rendus / self.lots if self.lots else 0.0, "cache": self.cache.stats()
+        }
+
+    async def _regroupe(self):
+        boucle = asyncio.get_running_loop()
+        while True:
+            lot = [await self._file.get()]
+            limite = boucle.time() + self.delai_lot
+            while len(lot) < self.max_lot:
+                reste = limite - boucle.time()
+                if reste <= 0: break
+                try: lot.append(await asyncio.wait_for(self._file.get(), reste))
+                except asyncio.TimeoutError: break
+            await self._slots.acquire()
+            asyncio.create_task(self._execute(lot))
+
+    async def _execute(self, lot):
+        try:
+            resultats = await asyncio.get_running_loop().run_in_executor(self._executor, _render_lot, [r for _, r, _ in lot])
+            self.lots += 1; self.rendus += len(lot)
+            for (cle, _, futur), pdf_bytes in zip(lot, resultats):
+                self.cache.put(cle, pdf_bytes)
+                if not futur.done(): futur.set_result(pdf_bytes)
+        except Exception as e:
+            for _, _, futur in lot:
+                if not futur.done(): futur.set_exception(e)
+        finally:
+            for cle, _, _ in lot: self._en_cours.pop(cle, None)
+            self._attente -= len(lot)
+            self._slots.release()
+
+# ==========================================
+# APPLICATION
+# ==========================================
+
+def create_app(workers=None, max_lot=MAX_LOT, delai_lot=DELAI_LOT, max_attente=MAX_ATTENTE):
+    recettes = RecipeService(RecipeTable.open())
+    pdfs = PdfRenderer(workers, max_lot, delai_lot, max_attente)
+    demarrage = time.time()
+
+    async def lire_recette(request):
+        try: corps = await request.json()
+        except ValueError: raise ErreurRequete("corps JSON invalide")
+        return recettes.compute(*parse_request(corps))
+
+    async def recette(request):
+        try: return JSONResponse(await lire_recette(request))
+        except ErreurRequete as e: return JSONResponse({"erreur": str(e)}, status_code=400)
+
+    async def recette_pdf(request):
+        try:
+            data = await lire_recette(request)
+            pdf_bytes = await pdfs.render(data)
+        except ErreurRequete as e: return JSONResponse({"erreur": str(e)}, status_code=400)
+        except ServiceSature as e: return JSONResponse({"erreur": f"service saturé ({e})"}, status_code=503, headers={"Retry-After": "1"})
+        return Response(pdf_bytes, media_type="application/pdf", headers={"Content-Disposition": f'inline; filename="BeerFactory_{data["style"]}.pdf"'})
+
+    async def options(request):
+        return JSONResponse({
+            "styles": STYLES_DEF, "amertumes": IBU_MAP, "aromes": dict(AROMA_DATA),
+            "volume": [10, 100], "pas_volume": 10, "abv": [3.0, 12.0], "pas_abv": 0.1, "max_aromes": 2
+        })
+
+    async def sante(request):
+        return JSONResponse({"statut": "ok", "uptime_s": time.time() - demarrage, "table": recettes.table is not None})
+
+    async def stats(request):
+        return JSONResponse({"recettes": recettes.cache.stats(), "pdf": pdfs.stats()})
+
+    @asynccontextmanager
+    async def cycle_de_vie(app):
+        await pdfs.start()
+        yield
+        await pdfs.stop()
+
+    return Starlette(routes=[
+        Route("/recette", recette, methods=["POST"]),
+        Route("/recette/pdf", recette_pdf, methods=["POST"]),
+        Route("/options", options), Route("/sante", sante), Route("/stats", stats)
+    ], lifespan=cycle_de_vie)
+
+def main():
+    import uvicorn
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="processus de rendu PDF (défaut : nombre de cœurs)")
+    parser.add_argument("--max-lot", type=int, default=MAX_LOT)
+    parser.add_argument("--delai-lot", type=float, default=DELAI_LOT)
+    parser.add_argument("--max-attente", type=int, default=MAX_ATTENTE)
+    args = parser.parse_args()
+    app = create_app(args.workers, args.max_lot, args.delai_lot, args.max_attente)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import argparse
+from itertools import combinations
+
+import numpy as np
+
+from moteur_biere import (
+    EFFICACITE, MALTS_DB, HOPS_DB, round_grain, calc_og_from_abv, estimate_color, resolve_ingredients
+)
+import houblonnage
+
+# ==========================================
+# RECETTE À N GRAINS / M HOUBLONS & SOLVEUR INVERSE (OG, EBC, IBU)
+# ==========================================
+# Le moteur fixe 2 malts (ratios de style) et 2 houblons (60 / 5 min) : la couleur en découle.
+# Ici on part des cibles et on cherche les ingrédients.
+#
+# Grains : pour une OG cible, la masse totale découle des ratios r (somme 1), et la couleur vaut
+#   MCU = P * Σ r.ebc / (k * Σ r.yield)      (P = points de densité, k = efficacité x 3.83)
+# viser un EBC revient donc à la contrainte LINÉAIRE Σ r_i (ebc_i - c * yield_i) = 0.
+# Pour chaque combinaison de malts, on projette une répartition de référence (base ~85 %)
+# sur {contrainte couleur, Σ r = 1, bornes par malt, part minimale de malts de base}
+# par projections alternées de Dykstra, vectorisées sur toutes les combinaisons à la fois.
+# Houblons : poids de chaque ajout = part d'IBU / utilisation (table gravité x temps de houblonnage.py),
+# bornés en grammes, vectorisé sur toutes les affectations de variétés aux ajouts.
+# Un ajout est un nombre de minutes d'ébullition ou un dict houblonnage ({"type": "whirlpool", "temps", "temperature"}, ...).
+
+ITERATIONS = 50
+TOLERANCE_EBC = 0.5
+TOLERANCE_IBU = 0.5
+AJOUTS_DEFAUT = ((60, 0.8), (5, 0.2))   # (ajout, part de l'IBU) : le schéma du moteur
+
+# --- MODÈLE ---
+def is_base_malt(nom):
+    props = MALTS_DB[nom]
+    return props["ebc"] <= 20 and props["yield"] >= 76
+
+def default_ratio_max(nom):
+    # Plafonds usuels : malts de base libres, caramel 20 %, torréfiés et autres spéciaux 10 %
+    ebc = MALTS_DB[nom]["ebc"]
+    if is_base_malt(nom): return 1.0
+    if 20 < ebc <= 200: return 0.20
+    return 0.10
+
+def addition_spec(ajout):
+    # 60 -> {"type": "ebullition", "temps": 60} ; un dict est recopié tel quel
+    return dict(ajout) if isinstance(ajout, dict) else {"type": "ebullition", "temps": ajout}
+
+def _ebc_from_mcu(mcu): return 2.93 * (mcu * 4.23) ** 0.6859
+def _mcu_from_ebc(ebc): return (ebc / 2.93) ** (1 / 0.6859) / 4.23
+
+def evaluate(grains, houblons, volume, efficacite=EFFICACITE):
+    # grains : [(nom, kg)] ; houblons : ajouts houblonnage [{"nom", "poids", "type", "temps", ...}] -> og, abv, ebc, ibu obtenus
+    points = sum(kg * MALTS_DB[nom]["yield"] * efficacite * 3.83 for nom, kg in grains) / volume
+    og = 1 + points / 1000
+    ebc = estimate_color([(kg, MALTS_DB[nom]) for nom, kg in grains], volume)
+    ibu = float(houblonnage.total_ibu(houblons, volume, og * 0.85)) if houblons else 0.0
+    return {"og": og, "abv": (og - 1.010) * 131.25, "ebc": ebc, "ibu": ibu}
+
+# --- GRAINS ---
+def solve_grains(og, ebc, volume, malts=None, n_malts=(2, 3), bornes=None, base_min=0.6, part_base=0.85,
+                 efficacite=EFFICACITE, top=5, iterations=ITERATIONS):
+    # malts : malts autorisés (défaut : tous) ; n_malts : nombre(s) de malts par recette
+    # bornes : {nom: (ratio min, ratio max)} (défaut : 2 % mini, plafond selon le type de malt)
+    # -> jusqu'à `top` solutions {"grains": [(nom, ratio)], "masse": kg, "ebc": obtenu}, meilleures d'abord
+    malts = list(malts or MALTS_DB); bornes = bornes or {}
+    k = efficacite * 3.83; points = (og - 1) * 1000
+    c = _mcu_from_ebc(ebc) * k / points
+    groupes = []
+    for n in ([n_malts] if isinstance(n_malts, int) else n_malts):
+        combos = [combo for combo in combinations(malts, n) if any(is_base_malt(m) for m in combo)]
+        if combos: groupes.append(_solve_group(combos, c, bornes, base_min, part_base, iterations))
+    if not groupes: return []
+    noms = [combo for g in groupes for combo in g[0]]
+    ratios = [r for g in groupes for r in g[1]]; rapport = np.concatenate([g[2] for g in groupes])
+    distance = np.concatenate([g[3] for g in groupes])
+    # rapport = Σ r.ebc / Σ r.yield ; vaut c quand la couleur est exactement atteinte
+    ebc_obtenu = _ebc_from_mcu(points * rapport / k)
+    # Cible atteinte (écart sous la tolérance) d'abord, puis la répartition la plus proche de la référence
+    ordre = np.lexsort((distance, np.maximum(np.abs(ebc_obtenu - ebc) - TOLERANCE_EBC, 0)))[:top]
+    solutions = []
+    for i in ordre:
+        r = ratios[i]
+        rendement = sum(ri * MALTS_DB[m]["yield"] for m, ri in zip(noms[i], r))
+        solutions.append({"grains": list(zip(noms[i], r.tolist())), "masse": points * volume / (k * rendement), "ebc": float(ebc_obtenu[i])})
+    return solutions
+
+def _solve_group(combos, c, bornes, base_min, part_base, iterations):
+    # Toutes les combinaisons d'un même nombre de malts : tableaux (B, N)
+    Y = np.array([[MALTS_DB[m]["yield"] for m in combo] for combo in combos], dtype=np.float64)
+    E = np.array([[MALTS_DB[m]["ebc"] for m in combo] for combo in combos], dtype=np.float64)
+    base = np.array([[is_base_malt(m) for m in combo] for combo in combos], dtype=np.float64)
+    lo = np.array([[bornes.get(m, (0.02, None))[0] for m in combo] for combo in combos], dtype=np.float64)
+    hi = np.array([[bornes.get(m, (None, None))[1] or default_ratio_max(m) for m in combo] for combo in combos], dtype=np.float64)
+    N = Y.shape[1]
+
+    # Référence : part_base répartie sur les malts de base, le reste sur les spéciaux
+    n_base = base.sum(1, keepdims=True); n_spe = N - n_base
+    r0 = np.where(base == 1, np.where(n_spe > 0, part_base, 1.0) / n_base, (1 - part_base) / np.maximum(n_spe, 1))
+
+    # Sous-espace affine A r = b (couleur normalisée, somme des ratios) : projecteur précalculé par combinaison
+    a = E - c * Y; a /= np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    A = np.stack([a, np.ones_like(a)], axis=1)                              # (B, 2, N)
+    b = np.array([0.0, 1.0])
+    K = A.transpose(0, 2, 1) @ np.linalg.pinv(A @ A.transpose(0, 2, 1))     # (B, N, 2)
+    h = base / (base ** 2).sum(1, keepdims=True)
+
+    def affine(z): return z - (K @ ((A @ z[:, :, None])[:, :, 0] - b)[:, :, None])[:, :, 0]
+    def boite(z): return np.clip(z, lo, hi)
+    def demi_espace(z): return z + np.maximum(base_min - (base * z).sum(1, keepdims=True), 0) * h
+
+    # Dykstra : converge vers la projection de r0 sur l'intersection quand elle est non vide
+    x = r0.copy(); increments = [np.zeros_like(x) for _ in range(3)]
+    for _ in range(iterations):
+        for j, proj in enumerate((affine, boite, demi_espace)):
+            y = proj(x + increments[j]); increments[j] = x + increments[j] - y; x = y
+    # Point final dans les bornes, renormalisé : l'écart de couleur restant classe les combinaisons
+    x = boite(x); x /= x.sum(1, keepdims=True)
+    return combos, x, (x * E).sum(1) / (x * Y).sum(1), np.linalg.norm(x - r0, axis=1)
+
+# --- HOUBLONS ---
+def solve_hops(ibu, volume, og, ajouts=AJOUTS_DEFAUT, houblons=None, bornes_g=None, pas_g=1, top=5):
+    # ajouts : [(ajout, part de l'IBU)] ; houblons : variétés autorisées par ajout (défaut : toutes)
+    # bornes_g : [(g min, g max)] par ajout ; pas_g : précision des pesées (1 g comme le moteur)
+    # -> jusqu'à `top` solutions {"houblons": [ajout houblonnage avec "nom" et "poids"], "ibu": obtenu}
+    M = len(ajouts)
+    houblons = houblons or [list(HOPS_DB)] * M
+    bornes_g = bornes_g or [(0, None)] * M
+    specs = [addition_spec(a) for a, _ in ajouts]; parts = np.array([p for _, p in ajouts], dtype=np.float64); parts /= parts.sum()
+    lo = np.array([b[0] for b in bornes_g], dtype=np.float64)
+    hi = np.array([np.inf if b[1] is None else b[1] for b in bornes_g], dtype=np.float64)
+
+    # Toutes les affectations variété -> ajout : (C, M)
+    idx = np.indices([len(h) for h in houblons]).reshape(M, -1).T
+    aa = np.stack([np.array([HOPS_DB[n]["aa"] for n in houblons[j]])[idx[:, j]] for j in range(M)], axis=1)
+    # IBU apporté par gramme pour chaque ajout (0 sans isomérisation, ex. dry hop : ces ajouts restent à leur minimum)
+    minutes, coef, _ = houblonnage.schedule_arrays(specs)
+    u = houblonnage.utilization(og * 0.85, minutes) * coef * aa / 100 * 1000 / volume
+    actifs = u > 0
+    parts = parts * actifs; parts /= np.maximum(parts.sum(1, keepdims=True), 1e-12)
+    u_sur = np.where(actifs, u, 1.0)
+
+    g = np.where(actifs, np.clip(parts * ibu / u_sur, lo, hi), lo)
+    # Le reste (ajouts bloqués par une borne) est redistribué aux ajouts encore libres, au prorata des parts
+    for _ in range(M):
+        reste = ibu - (u * g).sum(1, keepdims=True)
+        libres = np.where(reste > 0, g < hi, g > lo) & actifs
+        poids = parts * libres; somme = poids.sum(1, keepdims=True)
+        g = np.clip(g + np.divide(reste * poids, u_sur * somme, out=np.zeros_like(g), where=somme > 0), lo, hi)
+    # Pesées au pas_g près : l'ajout le plus long absorbe l'arrondi des autres (écart final < 1/2 pas de cet ajout)
+    g = np.clip(np.rint(g / pas_g) * pas_g, lo, hi)
+    j0 = int(np.argmax(minutes * coef))
+    if actifs[0, j0]:
+        autres = (u * g).sum(1) - u[:, j0] * g[:, j0]
+        g[:, j0] = np.clip(np.rint((ibu - autres) / u[:, j0] / pas_g) * pas_g, lo[j0], hi[j0])
+    ibu_obtenu = (u * g).sum(1)
+    # Cible atteinte d'abord, puis répartition la plus fidèle aux parts, puis le moins de houblon
+    ecart_parts = np.abs(u * g / np.maximum(ibu_obtenu, 1e-9)[:, None] - parts).sum(1)
+    ordre = np.lexsort((g.sum(1), ecart_parts, np.maximum(np.abs(ibu_obtenu - ibu) - TOLERANCE_IBU, 0)))[:top]
+    return [{
+        "houblons": [dict(specs[j], nom=houblons[j][idx[i, j]], poids=int(g[i, j]) if float(pas_g).is_integer() else float(g[i, j])) for j in range(M)], "ibu": float(ibu_obtenu[i])
+    } for i in ordre]
+
+# --- RECETTE COMPLÈTE ---
+def solve_recipe(volume, ebc, ibu, og=None, abv=None, style=None, aromes=(), malts=None, n_malts=(2, 3), bornes=None,
+                 ajouts=AJOUTS_DEFAUT, houblons=None, bornes_g=None, pas_g=1, efficacite=EFFICACITE, top=3):
+    # Cibles : og (ou abv), ebc, ibu. style / aromes : levure et variétés de houblon par défaut (règles du moteur,
+    # entrée "defaut" sans style) ; houblons=[[...], ...] pour laisser le solveur choisir parmi plusieurs variétés.
+    # -> jusqu'à `top` dicts au format recette_data (N grains, M houblons) + "ecarts" sur les cibles,
+    #    calculés après arrondi des grains à 50 g et des houblons au gramme.
+    if og is None: og = calc_og_from_abv(abv)
+    ing = resolve_ingredients(style, aromes)
+    if houblons is None:
+        houblons = [[ing["houblon_amer"]]] + [[ing["houblon_arome"]]] * (len(ajouts) - 1)
+    recettes = []
+    # L'arrondi à 50 g déplace la couleur (surtout avec les malts torréfiés) : on arrondit un lot plus large
+    # de solutions continues et on garde celles qui restent les plus proches des cibles.
+    for sol in solve_grains(og, ebc, volume, malts, n_malts, bornes, efficacite=efficacite, top=max(20, 5 * top)):
+        grains = [(nom, round_grain(sol["masse"] * r)) for nom, r in sol["grains"]]
+        grains = [(nom, kg) for nom, kg in grains if kg > 0]
+        obtenu = evaluate(grains, [], volume, efficacite)
+        hops = solve_hops(ibu, volume, obtenu["og"], ajouts, houblons, bornes_g, pas_g, top=1)[0]["houblons"]
+        obtenu = evaluate(grains, hops, volume, efficacite)
+        total = sum(kg for _, kg in grains)
+        eau_emp = total * 3.0; eau_rinc = max((volume * 1.15 + total) - eau_emp, 0)
+        recettes.append({
+            "style": style or "Sur mesure", "aromes": list(aromes), "volume": volume, "abv": round(obtenu["abv"], 1),
+            "og": obtenu["og"], "ibu": obtenu["ibu"], "ebc": obtenu["ebc"], "eff": efficacite,
+            "grains": [{"nom": nom, "poids": kg, "ratio": kg / total} for nom, kg in grains],
+            "houblons": [{"nom": h["nom"], "poids": h["poids"], "usage": houblonnage.usage_label(h), "aa": HOPS_DB[h["nom"]]["aa"]} for h in hops],
+            "eau_emp": eau_emp, "eau_rinc": eau_rinc, "levure": ing["levure"],
+            "ecarts": {"og": obtenu["og"] - og, "ebc": obtenu["ebc"] - ebc, "ibu": obtenu["ibu"] - ibu}
+        })
+    recettes.sort(key=lambda r: (max(abs(r["ecarts"]["ebc"]) - TOLERANCE_EBC, 0), abs(r["ecarts"]["og"])))
+    return recettes[:top]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--volume", type=float, default=20)
+    parser.add_argument("--og", type=float); parser.add_argument("--abv", type=float, default=6.0)
+    parser.add_argument("--ebc", type=float, required=True); parser.add_argument("--ibu", type=float, required=True)
+    parser.add_argument("--style"); parser.add_argument("--malts", type=int, nargs="+", default=[2, 3])
+    args = parser.parse_args()
+    for recette in solve_recipe(args.volume, args.ebc, args.ibu, og=args.og, abv=args.abv, style=args.style, n_malts=args.malts):
+        e = recette["ecarts"]
+        print(f"OG {recette['og']:.4f} ({e['og']:+.4f}) | EBC {recette['ebc']:.1f} ({e['ebc']:+.1f}) | IBU {recette['ibu']:.1f} ({e['ibu']:+.1f})")
+        for grain in recette["grains"]: print(f"   {grain['poids']:>5.2f} kg  {grain['nom']} ({grain['ratio']:.0%})")
+        for hop in recette["houblons"]: print(f"   {hop['poids']:>5} g   {hop['nom']} ({hop['usage']})")
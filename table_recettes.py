@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from moteur_biere import (
+    AROMA_DATA, STYLES_DEF, IBU_MAP, EFFICACITE, MALTS_DB, HOPS_DB, calc_og_from_abv
+)
+import calcul_vectoriel as cv
+
+# ==========================================
+# TABLE PRÉCALCULÉE DES RECETTES
+# ==========================================
+# L'espace des curseurs est fini (7 styles x 10 volumes x 91 abv x 4 amertumes x 67 ensembles d'arômes) :
+# toutes les recettes sont calculées une fois (python table_recettes.py) et stockées en colonnes .npy.
+# L'app ouvre les colonnes en mmap : une recherche = un calcul d'indice + quelques lectures,
+# et tous les processus d'une même machine partagent la même copie en page cache.
+#
+# Seules les valeurs non dérivables sont stockées :
+#   - poids des grains en pas de 50 g (round_grain renvoie k / 20, reconstruit à l'identique)
+#   - grammes de houblon (déjà tronqués)
+#   - EBC (float64)
+# OG et volumes d'eau sont recalculés à la lecture avec les mêmes opérations que moteur_biere.
+
+DOSSIER_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "table_recettes")
+FORMAT_VERSION = 1
+COLONNES = {"k_base": np.uint16, "k_spe": np.uint16, "grammes_amer": np.int32, "grammes_arome": np.int32, "ebc": np.float64}
+
+def data_fingerprint():
+    # Toute modification des bases ou des axes rend la table périmée
+    contenu = json.dumps({
+        "version": FORMAT_VERSION, "malts": MALTS_DB, "hops": HOPS_DB, "styles": list(STYLES_DEF), "ibu": IBU_MAP,
+        "aromes": AROMA_DATA, "eff": EFFICACITE, "combos": cv.build_combos()["ingredients"]
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()
+
+# --- CONSTRUCTION ---
+def build_table(dossier=DOSSIER_TABLE):
+    grille, res = cv.compute_sweep()
+    os.makedirs(dossier, exist_ok=True)
+    colonnes = {
+        "k_base": np.rint(res["poids_base"] * 20), "k_spe": np.rint(res["poids_spe"] * 20),
+        "grammes_amer": res["grammes_amer"], "grammes_arome": res["grammes_arome"], "ebc": res["ebc"]
+    }
+    for nom, dtype in COLONNES.items():
+        valeurs = colonnes[nom]
+        if np.issubdtype(dtype, np.integer) and valeurs.max() > np.iinfo(dtype).max:
+            raise ValueError(f"Colonne {nom} : valeur hors limites pour {np.dtype(dtype).name}")
+        np.save(os.path.join(dossier, f"{nom}.npy"), valeurs.astype(dtype))
+    meta = {
+        "version": FORMAT_VERSION, "empreinte": data_fingerprint(), "lignes": int(len(grille[0])),
+        "styles": cv.STYLES, "volumes": cv.VOLUMES, "abvs": cv.ABVS, "amertumes": cv.AMERTUMES,
+        "aroma_sets": [list(s) for s in cv.AROMA_SETS], "ingredients": cv.get_combos()["ingredients"]
+    }
+    # meta.json en dernier : une table sans meta est considérée absente
+    with open(os.path.join(dossier, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    return meta
+
+# --- LECTURE ---
+class RecipeTable:
+    def __init__(self, dossier, meta):
+        self.meta = meta
+        self.cols = {nom: np.load(os.path.join(dossier, f"{nom}.npy"), mmap_mode="r") for nom in COLONNES}
+        self.style_idx = {s: i for i, s in enumerate(meta["styles"])}
+        self.volume_idx = {v: i for i, v in enumerate(meta["volumes"])}
+        self.amertume_idx = {b: i for i, b in enumerate(meta["amertumes"])}
+        self.aroma_idx = {frozenset(s): i for i, s in enumerate(meta["aroma_sets"])}
+        self.abvs = meta["abvs"]
+        # Index dense : ordre (style, volume, abv, amertume, arômes), comme cv.sweep_grid
+        n_r = len(meta["aroma_sets"]); n_b = len(meta["amertumes"]); n_a = len(self.abvs); n_v = len(meta["volumes"])
+        self.strides = (n_v * n_a * n_b * n_r, n_a * n_b * n_r, n_b * n_r, n_r, 1)
+
+    @classmethod
+    def open(cls, dossier=DOSSIER_TABLE):
+        # None si la table est absente ou ne correspond plus aux bases actuelles
+        chemin_meta = os.path.join(dossier, "meta.json")
+        if not os.path.exists(chemin_meta): return None
+        with open(chemin_meta, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION or meta.get("empreinte") != data_fingerprint(): return None
+        return cls(dossier, meta)
+
+    def index_of(self, style, volume, abv, bitterness, aromas):
+        s = self.style_idx.get(style); v = self.volume_idx.get(volume); b = self.amertume_idx.get(bitterness)
+        r = self.aroma_idx.get(frozenset(aromas))
+        a = int(round((abv - self.abvs[0]) * 10))
+        if None in (s, v, b, r) or not 0 <= a < len(self.abvs) or self.abvs[a] != abv: return None
+        st_s, st_v, st_a, st_b, _ = self.strides
+        return s * st_s + v * st_v + a * st_a + b * st_b + r
+
+    def lookup(self, style, volume, abv, bitterness, aromas):
+        # Même dict que generate_recipe, ou None si les paramètres sont hors grille
+        i = self.index_of(style, volume, abv, bitterness, aromas)
+        if i is None: return None
+        ing = self.meta["ingredients"][self.style_idx[style]][self.aroma_idx[frozenset(aromas)]]
+        c = self.cols
+        poids_base = int(c["k_base"][i]) / 20; poids_spe = int(c["k_spe"][i]) / 20
+        total_grain_affiche = poids_base + poids_spe
+        eau_empatage = total_grain_affiche * 3.0; eau_rincage = (volume * 1.15 + total_grain_affiche) - eau_empatage
+        if eau_rincage < 0: eau_rincage = 0
+        return {
+            "style": style, "aromes": list(aromas), "volume": volume, "abv": abv,
+            "og": calc_og_from_abv(abv), "ibu": IBU_MAP[bitterness], "ebc": float(c["ebc"][i]), "eff": EFFICACITE,
+            "grains": [{"nom": ing["malt_base"], "poids": poids_base, "ratio": ing["ratio_base"]}, {"nom": ing["malt_spe"], "poids": poids_spe, "ratio": ing["ratio_spe"]}],
+            "houblons": [{"nom": ing["houblon_amer"], "poids": int(c["grammes_amer"][i]), "usage": "Ebu 60min", "aa": HOPS_DB.get(ing["houblon_amer"], {'aa':10})['aa']},
+                         {"nom": ing["houblon_arome"], "poids": int(c["grammes_arome"][i]), "usage": "Arome 5min", "aa": HOPS_DB.get(ing["houblon_arome"], {'aa':5})['aa']}],
+            "eau_emp": eau_empatage, "eau_rinc": eau_rincage, "levure": ing["levure"]
+        }
+
+if __name__ == "__main__":
+    dossier = sys.argv[1] if len(sys.argv) > 1 else DOSSIER_TABLE
+    meta = build_table(dossier)
+    taille = sum(os.path.getsize(os.path.join(dossier, f"{nom}.npy")) for nom in COLONNES)
+    print(f"{meta['lignes']} recettes écrites dans {dossier} ({taille / 1e6:.1f} Mo)")